@@ -1,6 +1,11 @@
 from django.contrib import admin
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 
-from .models import Category, Location, Post, Comment
+from .export import (POST_FIELDS, csv_lines, export_records, jsonl_lines,
+                     post_rows)
+from .models import Category, Location, Post, Comment, ImageJob
+from .search import filter_posts
 
 admin.site.empty_value_display = 'Не задано'
 
@@ -21,12 +26,58 @@ class PostAdmin(admin.ModelAdmin):
         'category',
     )
 
-    search_fields = ('title',)
+    search_fields = ('title', 'text')
     list_filter = ('category',)
     list_display_links = ('title',)
+    actions = ('export_jsonl', 'export_csv')
+
+    @admin.action(description='Выгрузить с комментариями в JSONL')
+    def export_jsonl(self, request, queryset):
+        lines = jsonl_lines(export_records(
+            posts=queryset,
+            comments=Comment.objects.filter(post__in=queryset.values('pk'))))
+        return self.stream(lines, 'posts.jsonl', 'application/x-ndjson')
+
+    @admin.action(description='Выгрузить в CSV')
+    def export_csv(self, request, queryset):
+        return self.stream(csv_lines(post_rows(queryset), POST_FIELDS),
+                           'posts.csv', 'text/csv')
+
+    def get_search_results(self, request, queryset, search_term):
+        # Вместо icontains по search_fields — полнотекстовый индекс.
+        if not search_term.strip():
+            return queryset, False
+        return filter_posts(queryset, search_term), False
+
+    def stream(self, lines, filename, content_type):
+        response = StreamingHttpResponse(
+            lines, content_type=f'{content_type}; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'post',
+        'status',
+        'attempts',
+        'available_at',
+        'updated_at',
+        'last_error',
+    )
+    list_filter = ('status',)
+    list_select_related = ('post',)
+    readonly_fields = ('created_at', 'updated_at')
+    actions = ('retry',)
+
+    @admin.action(description='Повторить обработку')
+    def retry(self, request, queryset):
+        queryset.update(status=ImageJob.PENDING, attempts=0,
+                        available_at=timezone.now())
 
 
 admin.site.register(Category)
 admin.site.register(Location)
 admin.site.register(Post, PostAdmin)
 admin.site.register(Comment)
+admin.site.register(ImageJob, ImageJobAdmin)
@@ -0,0 +1,76 @@
+"""JSON-версии лент и страницы публикации для мобильного клиента.
+
+Классы наследуют HTML-views, поэтому выборка, видимость и пагинация у них
+общие; отличается только ответ. Ленты всегда листаются курсорами.
+ETag и Last-Modified тоже наследуются: они берутся из счётчика поколений
+кэша страниц, который меняют и правки, и смена видимости публикаций.
+"""
+from django.http import JsonResponse
+from django.urls import reverse
+
+from . import views
+
+
+def post_data(post, request):
+    category = post.category
+    return {
+        'id': post.id,
+        'url': request.build_absolute_uri(
+            reverse('blog:api_post_detail', args=(post.id,))),
+        'title': post.title,
+        'text': post.text,
+        'pub_date': post.pub_date,
+        'updated_at': post.updated_at,
+        'author': post.author.username,
+        'category': category and {'slug': category.slug,
+                                  'title': category.title},
+        'location': (post.location.name
+                     if post.location and post.location.is_published
+                     else None),
+        'image': post.image.url if post.image else None,
+        'comment_count': post.comment_count,
+    }
+
+
+class FeedAPIMixin:
+    keyset_pagination = True
+
+    def page_url(self, cursor):
+        if cursor is None:
+            return None
+        return self.request.build_absolute_uri(
+            f'{self.request.path}?{self.cursor_kwarg}={cursor}')
+
+    def render_to_response(self, context, **response_kwargs):
+        page = context['page_obj']
+        return JsonResponse({
+            'results': [post_data(post, self.request) for post in page],
+            'next': self.page_url(page.next_cursor),
+            'previous': self.page_url(page.previous_cursor),
+        })
+
+
+class PostListView(FeedAPIMixin, views.PostListView):
+    pass
+
+
+class CategoryPostListView(FeedAPIMixin, views.CategoryPostListView):
+    pass
+
+
+class ProfileListView(FeedAPIMixin, views.ProfileListView):
+    pass
+
+
+class PostDetailView(views.PostDetailView):
+    def render_to_response(self, context, **response_kwargs):
+        comments = context['comments']
+        data = post_data(self.object, self.request)
+        data['comments'] = [views.comment_data(comment)
+                            for comment in comments]
+        data['comments_next'] = None
+        if comments.has_next():
+            data['comments_next'] = self.request.build_absolute_uri(
+                reverse('blog:post_comments', args=(self.object.id,))
+                + f'?format=json&cursor={comments.next_cursor}')
+        return JsonResponse(data)
@@ -0,0 +1,148 @@
+"""Асинхронные версии views для чтения лент и публикаций.
+
+ORM Django 3.2 синхронный, поэтому обращения к базе и отрисовка шаблонов
+выполняются в отдельном пуле потоков ограниченного размера
+(BLOG_ASYNC_ORM_WORKERS), а цикл событий ASGI-сервера остаётся свободным.
+Маршруты используют эти классы, если включена настройка BLOG_ASYNC_VIEWS.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
+
+from . import views
+from .cache import anonymous_page_cache
+from .conditional import ConditionalGetMixin, set_validators
+from .models import Category
+from .profiling import instrument_thread
+from .routers import ReplicaReadMixin, reading_from_replica, replica_reads
+
+orm_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'BLOG_ASYNC_ORM_WORKERS', 8),
+    thread_name_prefix='blog-orm',
+)
+
+
+def _call_and_release(func, *args, **kwargs):
+    instrument_thread()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_orm(func, *args, **kwargs):
+    return await sync_to_async(
+        _call_and_release, thread_sensitive=False, executor=orm_executor
+    )(func, *args, **kwargs)
+
+
+class AsyncViewMixin:
+    http_method_names = ['get', 'head', 'options']
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        sync_view = super().as_view(**initkwargs)
+
+        async def view(request, *args, **kwargs):
+            return await sync_view(request, *args, **kwargs)
+
+        update_wrapper(view, sync_view)
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        # Контекст чтения с реплик переходит в потоки run_orm вместе с
+        # остальными contextvars.
+        if not isinstance(self, ReplicaReadMixin):
+            return await self.handle(request, *args, **kwargs)
+        with replica_reads(request):
+            response = await self.handle(request, *args, **kwargs)
+            response.from_replica = reading_from_replica()
+            return response
+
+    async def handle(self, request, *args, **kwargs):
+        if request.method.lower() not in self.http_method_names:
+            return self.http_method_not_allowed(request, *args, **kwargs)
+        if request.method == 'OPTIONS':
+            return self.options(request, *args, **kwargs)
+        if (not isinstance(self, ConditionalGetMixin)
+                or reading_from_replica()):
+            return await self.get(request, *args, **kwargs)
+        response, etag, last_modified = await run_orm(
+            self.check_preconditions, request)
+        if response is None:
+            response = await self.get(request, *args, **kwargs)
+            set_validators(response, etag, last_modified)
+        return response
+
+    def render_page(self, context):
+        return self.render_to_response(context).render()
+
+
+class AsyncListMixin(AsyncViewMixin):
+    page_result = None
+
+    def fetch_page(self):
+        paginator, page, object_list, is_paginated = self.paginate_queryset(
+            self.object_list, self.get_paginate_by(self.object_list))
+        page.object_list = list(object_list)
+        return paginator, page, page.object_list, is_paginated
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.page_result is not None:
+            return self.page_result
+        return super().paginate_queryset(queryset, page_size)
+
+    def build_page(self):
+        return self.render_page(self.get_context_data())
+
+    async def get(self, request, *args, **kwargs):
+        self.object_list = self.get_queryset()
+        self.page_result = await run_orm(self.fetch_page)
+        return await run_orm(self.build_page)
+
+
+@method_decorator(anonymous_page_cache, name='dispatch')
+class PostListView(AsyncListMixin, views.PostListView):
+    pass
+
+
+@method_decorator(anonymous_page_cache, name='dispatch')
+class CategoryPostListView(AsyncListMixin, views.CategoryPostListView):
+    async def get(self, request, *args, **kwargs):
+        self.category = await run_orm(
+            get_object_or_404, Category,
+            slug=self.kwargs['category_slug'], is_published=True)
+        return await super().get(request, *args, **kwargs)
+
+
+class ProfileListView(AsyncListMixin, views.ProfileListView):
+    async def get(self, request, *args, **kwargs):
+        # Выборка публикаций фильтрует по id автора, поэтому он нужен раньше.
+        self.profile = await run_orm(self.get_profile)
+        return await super().get(request, *args, **kwargs)
+
+
+@method_decorator(anonymous_page_cache, name='dispatch')
+class PostDetailView(AsyncViewMixin, views.PostDetailView):
+    comments = None
+
+    def get_comments(self):
+        return self.comments
+
+    def build_page(self):
+        return self.render_page(self.get_context_data(object=self.object))
+
+    async def get(self, request, *args, **kwargs):
+        # Первая порция комментариев выбирается по pk одновременно с
+        # публикацией; если публикация скрыта, get_object вернёт 404.
+        self.object, self.comments = await asyncio.gather(
+            run_orm(self.get_object),
+            run_orm(views.paginate_comments, self.kwargs['pk'],
+                    request.GET.get('comments')))
+        return await run_orm(self.build_page)
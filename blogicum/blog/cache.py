@@ -0,0 +1,113 @@
+import asyncio
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import (get_conditional_response,
+                                patch_cache_control, patch_vary_headers)
+from django.utils.http import parse_http_date_safe
+
+PAGE_GENERATION_KEY = 'blog:pages:generation'
+PAGE_MODIFIED_KEY = 'blog:pages:modified'
+
+
+def page_cache_generation():
+    # Начальное значение берётся из часов, чтобы после вытеснения счётчика
+    # из кэша не вернуться к номеру, под которым ещё лежат старые страницы.
+    cache.add(PAGE_GENERATION_KEY, time.time_ns(), timeout=None)
+    return cache.get(PAGE_GENERATION_KEY)
+
+
+def page_last_modified():
+    """Время последнего сброса кэша страниц, в секундах."""
+    cache.add(PAGE_MODIFIED_KEY, int(time.time()), timeout=None)
+    return cache.get(PAGE_MODIFIED_KEY)
+
+
+def purge_page_cache():
+    """Делает недействительными все закэшированные страницы блога."""
+    try:
+        cache.incr(PAGE_GENERATION_KEY)
+    except ValueError:
+        cache.set(PAGE_GENERATION_KEY, time.time_ns(), timeout=None)
+    cache.set(PAGE_MODIFIED_KEY, int(time.time()), timeout=None)
+
+
+def page_cache_key(request):
+    url = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'blog:page:{page_cache_generation()}:{request.method}:{url}'
+
+
+def _bypass_page_cache(request):
+    timeout = getattr(settings, 'BLOG_PAGE_CACHE_TIMEOUT', 0)
+    return (not timeout
+            or request.method not in ('GET', 'HEAD')
+            or settings.SESSION_COOKIE_NAME in request.COOKIES)
+
+
+def _cached_page(request, response):
+    # Сохранённая страница уже несёт ETag и Last-Modified: если у клиента
+    # та же версия, отвечаем 304.
+    return get_conditional_response(
+        request,
+        etag=response.get('ETag'),
+        last_modified=parse_http_date_safe(response.get('Last-Modified', '')),
+        response=response)
+
+
+def _store_page(response, key):
+    patch_vary_headers(response, ('Cookie',))
+    # Страница с реплики может отставать от текущего поколения кэша.
+    if (response.status_code != 200 or response.cookies
+            or getattr(response, 'from_replica', False)):
+        return response
+    timeout = settings.BLOG_PAGE_CACHE_TIMEOUT
+    patch_cache_control(response, max_age=timeout)
+    if hasattr(response, 'render') and callable(response.render):
+        response.add_post_render_callback(
+            lambda rendered: cache.set(key, rendered, timeout))
+    else:
+        cache.set(key, response, timeout)
+    return response
+
+
+def anonymous_page_cache(view_func):
+    """Кэширует ответы для посетителей без сессии.
+
+    Запросы с cookie сессии идут мимо кэша: для них страница зависит от
+    пользователя. Время жизни задаёт BLOG_PAGE_CACHE_TIMEOUT, значение 0
+    отключает кэш. Подходит и для синхронных, и для асинхронных views.
+    """
+    if asyncio.iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapped_view(request, *args, **kwargs):
+            if _bypass_page_cache(request):
+                response = await view_func(request, *args, **kwargs)
+                patch_vary_headers(response, ('Cookie',))
+                return response
+            key = await sync_to_async(page_cache_key)(request)
+            response = await sync_to_async(cache.get)(key)
+            if response is not None:
+                return _cached_page(request, response)
+            response = await view_func(request, *args, **kwargs)
+            return await sync_to_async(_store_page)(response, key)
+
+        return async_wrapped_view
+
+    @wraps(view_func)
+    def wrapped_view(request, *args, **kwargs):
+        if _bypass_page_cache(request):
+            response = view_func(request, *args, **kwargs)
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        key = page_cache_key(request)
+        response = cache.get(key)
+        if response is not None:
+            return _cached_page(request, response)
+        response = view_func(request, *args, **kwargs)
+        return _store_page(response, key)
+
+    return wrapped_view
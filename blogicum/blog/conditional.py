@@ -0,0 +1,61 @@
+import hashlib
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .cache import page_cache_generation, page_last_modified
+from .routers import reading_from_replica
+
+
+class ConditionalGetMixin:
+    """ETag и Last-Modified для views блога; 304 — без выборки и шаблонов.
+
+    По умолчанию валидаторы берутся из счётчика поколений кэша страниц,
+    который меняется при любом изменении публикаций, комментариев,
+    категорий и местоположений, так что проверка не обращается к базе.
+    ETag учитывает адрес, пользователя и сессию: страница зависит от того,
+    кто её смотрит, и несёт CSRF-токен, который меняется при каждом входе.
+    """
+
+    def make_etag(self, *parts):
+        seed = ':'.join(map(str, (
+            getattr(settings, 'DEPLOY_ID', ''),
+            self.request.get_full_path(),
+            self.request.user.id,
+            getattr(getattr(self.request, 'session', None), 'session_key',
+                    None),
+            *parts,
+        )))
+        return quote_etag(hashlib.md5(seed.encode()).hexdigest())
+
+    def get_validators(self):
+        return self.make_etag(page_cache_generation()), page_last_modified()
+
+    def check_preconditions(self, request):
+        """Ответ 304, если он подходит, и валидаторы для полного ответа."""
+        etag, last_modified = self.get_validators()
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        return response, etag, last_modified
+
+    def dispatch(self, request, *args, **kwargs):
+        # Реплика может не знать о записи, которую уже учёл счётчик
+        # поколений, поэтому её страницы уходят без валидаторов.
+        if request.method not in ('GET', 'HEAD') or reading_from_replica():
+            return super().dispatch(request, *args, **kwargs)
+        response, etag, last_modified = self.check_preconditions(request)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            set_validators(response, etag, last_modified)
+        return response
+
+
+def set_validators(response, etag, last_modified):
+    if response.status_code != 200:
+        return response
+    if not response.has_header('ETag'):
+        response['ETag'] = etag
+    if last_modified and not response.has_header('Last-Modified'):
+        response['Last-Modified'] = http_date(last_modified)
+    return response
@@ -0,0 +1,84 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Comment, Post
+
+EXPORT_CHUNK_SIZE = 2000
+
+POST_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+    'is_published': 'is_published',
+    'is_visible': 'is_visible',
+    'author': 'author__username',
+    'category': 'category__slug',
+    'location': 'location__name',
+    'image': 'image',
+    'comment_count': 'comment_count',
+}
+
+COMMENT_FIELDS = {
+    'id': 'id',
+    'post_id': 'post_id',
+    'author': 'author__username',
+    'text': 'text',
+    'created_at': 'created_at',
+}
+
+
+def _rows(queryset, fields, chunk_size):
+    lookups = list(fields.values())
+    # values_list и iterator: строки идут из курсора порциями, без
+    # создания моделей и без кэша результатов QuerySet.
+    for values in (queryset.order_by('pk').values_list(*lookups)
+                   .iterator(chunk_size=chunk_size)):
+        yield dict(zip(fields, values))
+
+
+def post_rows(posts=None, since=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Публикации с автором, категорией и местоположением."""
+    posts = Post.objects.all() if posts is None else posts
+    if since is not None:
+        posts = posts.filter(updated_at__gte=since)
+    return _rows(posts, POST_FIELDS, chunk_size)
+
+
+def comment_rows(comments=None, since=None, chunk_size=EXPORT_CHUNK_SIZE):
+    comments = Comment.objects.all() if comments is None else comments
+    if since is not None:
+        comments = comments.filter(created_at__gte=since)
+    return _rows(comments, COMMENT_FIELDS, chunk_size)
+
+
+def jsonl_lines(records):
+    """Строки JSONL из пар (тип записи, данные)."""
+    for kind, row in records:
+        yield json.dumps({'type': kind, **row}, cls=DjangoJSONEncoder,
+                         ensure_ascii=False) + '\n'
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows, fieldnames):
+    writer = csv.DictWriter(_Echo(), fieldnames=fieldnames)
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def export_records(posts=None, comments=None, since=None,
+                   chunk_size=EXPORT_CHUNK_SIZE):
+    """Публикации, затем комментарии, для выгрузки в JSONL."""
+    for row in post_rows(posts, since, chunk_size):
+        yield 'post', row
+    for row in comment_rows(comments, since, chunk_size):
+        yield 'comment', row
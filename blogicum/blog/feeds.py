@@ -0,0 +1,173 @@
+"""Материализованные ленты категорий и авторов.
+
+Для каждой ленты в кэше лежит отсортированный список идентификаторов
+публикаций, поэтому страница N — срез списка и один in_bulk. Сохранение и
+удаление отдельной публикации правят затронутые списки на месте, массовые
+изменения видимости (publish_scheduled, правка категории) объявляют
+устаревшими все списки сразу. У каждого списка есть номер версии: если
+правки пересеклись, читатель видит несовпадение и строит список заново.
+Включается настройкой BLOG_MATERIALIZED_FEEDS.
+
+Ограничения. Каждая правка заново сериализует весь список ленты, так что
+её цена растёт с длиной ленты. Правка на месте безопасна только там, где
+cache.incr атомарен (memcached, Redis, LocMemCache в пределах процесса).
+FileBasedCache и DatabaseCache увеличивают счётчик через get и set: два
+писателя могут получить одну версию и потерять чужую правку, поэтому с
+ними затронутые списки просто удаляются и строятся заново по базе.
+"""
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import DEFAULT_DB_ALIAS
+
+from .models import Post
+
+FEEDS = {
+    'category': lambda pk: Post.objects.filter(is_visible=True,
+                                               category_id=pk),
+    'author': lambda pk: Post.objects.filter(is_visible=True, author_id=pk),
+}
+FEEDS_EPOCH_KEY = 'blog:feeds:epoch'
+
+
+def feeds_enabled():
+    return getattr(settings, 'BLOG_MATERIALIZED_FEEDS', False)
+
+
+def feed_state(post):
+    """Поля публикации, от которых зависят её места в лентах."""
+    return {
+        'id': post.pk,
+        'author_id': post.author_id,
+        'category_id': post.category_id,
+        'is_visible': post.is_visible,
+        'pub_date': post.pub_date,
+    }
+
+
+def memberships(state):
+    """Ленты, в которые входит публикация с таким состоянием."""
+    if state is None or not state['is_visible']:
+        return set()
+    feeds = {('author', state['author_id'])}
+    if state['category_id'] is not None:
+        feeds.add(('category', state['category_id']))
+    return feeds
+
+
+def sort_key(state):
+    # Новые публикации первыми, при равной дате — с большим id.
+    return (-state['pub_date'].timestamp(), -state['id'])
+
+
+def _key(kind, pk):
+    return f'blog:feed:{kind}:{pk}'
+
+
+def _version_key(kind, pk):
+    return f'blog:feed:{kind}:{pk}:version'
+
+
+def _incr_is_atomic():
+    return not isinstance(caches[DEFAULT_CACHE_ALIAS],
+                          (FileBasedCache, DatabaseCache))
+
+
+def _counter(key):
+    # Как и page_cache_generation(): начальное значение берётся из часов,
+    # чтобы вытесненный счётчик не вернулся к номеру старого списка.
+    cache.add(key, time.time_ns(), timeout=None)
+    return cache.get(key)
+
+
+def _epoch():
+    return _counter(FEEDS_EPOCH_KEY)
+
+
+def _bump(key):
+    _counter(key)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        value = time.time_ns()
+        cache.set(key, value, timeout=None)
+        return value
+
+
+def feed_ids(kind, pk):
+    """Идентификаторы публикаций ленты в порядке показа."""
+    version_key = _version_key(kind, pk)
+    cached = cache.get_many([_key(kind, pk), version_key, FEEDS_EPOCH_KEY])
+    version = cached.get(version_key)
+    if version is None:
+        version = _counter(version_key)
+    epoch = cached.get(FEEDS_EPOCH_KEY)
+    if epoch is None:
+        epoch = _epoch()
+    entry = cached.get(_key(kind, pk))
+    if entry is None or entry[:2] != (epoch, version):
+        # Список живёт до следующей правки, поэтому строится по основной
+        # базе, а не по реплике, которая может отставать.
+        keys = [
+            (-pub_date.timestamp(), -post_id)
+            for post_id, pub_date in FEEDS[kind](pk).using(DEFAULT_DB_ALIAS)
+            .order_by().values_list('id', 'pub_date')
+        ]
+        keys.sort()
+        entry = (epoch, version, keys)
+        cache.set(_key(kind, pk), entry)
+    return [-post_id for _, post_id in entry[2]]
+
+
+def update_feeds(before, after):
+    """Переносит публикацию между лентами по её старому и новому состоянию.
+
+    before или after равны None для новой и удалённой публикации.
+    """
+    old_feeds, new_feeds = memberships(before), memberships(after)
+    epoch = _epoch()
+    for kind, pk in old_feeds | new_feeds:
+        version = _bump(_version_key(kind, pk))
+        if not _incr_is_atomic():
+            cache.delete(_key(kind, pk))
+            continue
+        entry = cache.get(_key(kind, pk))
+        if entry is None or entry[:2] != (epoch, version - 1):
+            # Списка нет или его уже правил кто-то другой: читатель
+            # построит его заново.
+            continue
+        keys = list(entry[2])
+        if (kind, pk) in old_feeds:
+            index = bisect_left(keys, sort_key(before))
+            if index < len(keys) and keys[index] == sort_key(before):
+                del keys[index]
+        if (kind, pk) in new_feeds:
+            insort(keys, sort_key(after))
+        cache.set(_key(kind, pk), (epoch, version, keys))
+
+
+def invalidate_feeds():
+    """Объявляет устаревшими все ленты, например после массового update()."""
+    _bump(FEEDS_EPOCH_KEY)
+
+
+class FeedSequence:
+    """Лента для Paginator: длина из списка, страница — один in_bulk."""
+
+    def __init__(self, ids, queryset):
+        self.ids = ids
+        self.queryset = queryset
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        page_ids = self.ids[index]
+        posts = self.queryset.in_bulk(page_ids)
+        return [posts[post_id] for post_id in page_ids if post_id in posts]
@@ -11,6 +11,13 @@ class ProfileForm(forms.ModelForm):
         model = User
         fields = '__all__'
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if 'user_permissions' in self.fields:
+            # Permission.__str__ обращается к content_type.
+            field = self.fields['user_permissions']
+            field.queryset = field.queryset.select_related('content_type')
+
 
 class PostForm(forms.ModelForm):
     class Meta:
@@ -0,0 +1,117 @@
+"""Уменьшенные копии изображений публикаций для карточек в лентах.
+
+Копии (renditions) хранятся в том же хранилище, что и оригиналы, в
+каталоге renditions/. Их создаёт фоновая очередь из blog/jobs.py
+функцией generate_renditions.
+"""
+import logging
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+RENDITIONS_DIR = 'renditions'
+
+FORMAT_EXTENSIONS = {
+    'WEBP': 'webp',
+    'JPEG': 'jpg',
+}
+
+
+def rendition_widths():
+    return tuple(getattr(settings, 'BLOG_IMAGE_RENDITION_WIDTHS',
+                         (320, 640, 960)))
+
+
+def rendition_format():
+    return getattr(settings, 'BLOG_IMAGE_RENDITION_FORMAT', 'WEBP')
+
+
+def rendition_name(image_name, width):
+    stem, _ = os.path.splitext(image_name)
+    extension = FORMAT_EXTENSIONS[rendition_format()]
+    return f'{RENDITIONS_DIR}/{stem}_{width}w.{extension}'
+
+
+def open_image(image_file):
+    """Открывает изображение с учётом ориентации из EXIF."""
+    image_file.open('rb')
+    try:
+        image = Image.open(image_file)
+        image.load()
+    finally:
+        image_file.close()
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    return image
+
+
+def encode(image, width):
+    if image.width > width:
+        height = round(image.height * width / image.width)
+        image = image.resize((width, height), Image.Resampling.LANCZOS)
+    image_format = rendition_format()
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    # Без параметра exif Pillow не переносит метаданные в новый файл.
+    image.save(buffer, format=image_format,
+               quality=getattr(settings, 'BLOG_IMAGE_RENDITION_QUALITY', 80),
+               optimize=True)
+    return buffer.getvalue()
+
+
+def generate_renditions(image_file, widths=None, overwrite=False):
+    """Создаёт недостающие копии изображения и возвращает их имена."""
+    widths = widths or rendition_widths()
+    names = {width: rendition_name(image_file.name, width)
+             for width in widths}
+    missing = [width for width, name in names.items()
+               if overwrite or not default_storage.exists(name)]
+    if missing:
+        image = open_image(image_file)
+        for width in missing:
+            if overwrite and default_storage.exists(names[width]):
+                default_storage.delete(names[width])
+            default_storage.save(
+                names[width], ContentFile(encode(image, width)))
+    return names
+
+
+def delete_renditions(image_name):
+    for width in rendition_widths():
+        default_storage.delete(rendition_name(image_name, width))
+
+
+def has_renditions(image_file):
+    return bool(image_file) and all(
+        default_storage.exists(rendition_name(image_file.name, width))
+        for width in rendition_widths()
+    )
+
+
+def rendition_url(image_file, width):
+    """URL копии нужной ширины.
+
+    Пока копии нет, отдаётся оригинал: копии создаёт фоновая очередь
+    (blog/jobs.py). С BLOG_IMAGE_RENDITIONS_ON_REQUEST = True копия
+    создаётся прямо во время запроса.
+    """
+    if not image_file:
+        return ''
+    name = rendition_name(image_file.name, width)
+    if not default_storage.exists(name):
+        if not getattr(settings, 'BLOG_IMAGE_RENDITIONS_ON_REQUEST', False):
+            return image_file.url
+        try:
+            generate_renditions(image_file, widths=(width,))
+        except (OSError, ValueError):
+            logger.exception('Не удалось уменьшить %s', image_file.name)
+            return image_file.url
+    return default_storage.url(name)
@@ -0,0 +1,226 @@
+"""Очередь фоновой обработки изображений публикаций.
+
+Задачи хранятся в таблице ImageJob, поэтому отдельный брокер не нужен.
+Воркеры запускаются командой `manage.py run_image_jobs`.
+"""
+import logging
+from datetime import timedelta
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image
+
+from .cache import purge_page_cache
+from .images import delete_renditions, generate_renditions
+from .models import ImageJob, Post
+
+logger = logging.getLogger(__name__)
+
+# Тег ориентации EXIF, сегменты JPEG с метаданными и параметры, которые
+# переносятся в очищенный PNG.
+ORIENTATION = 0x0112
+JPEG_METADATA_MARKERS = (
+    0xE1,  # APP1: EXIF и XMP.
+    0xED,  # APP13: IPTC.
+)
+PNG_SAVE_PARAMS = ('transparency', 'icc_profile', 'dpi')
+
+
+class JobLeaseExpired(Exception):
+    def __str__(self):
+        return 'воркер не завершил задачу вовремя'
+
+
+def enqueue_image_job(post):
+    return ImageJob.objects.create(post=post)
+
+
+def lease_expired_before(now):
+    return now - timedelta(
+        seconds=getattr(settings, 'BLOG_IMAGE_JOB_LEASE', 600))
+
+
+def claim_next_job(now=None):
+    """Забирает одну готовую к выполнению задачу или возвращает None.
+
+    Задача помечается выполняемой условным UPDATE, поэтому два воркера не
+    возьмут одну и ту же задачу даже без SELECT ... FOR UPDATE.
+    """
+    now = now or timezone.now()
+    release_stale_jobs(now)
+    candidates = (
+        ImageJob.objects
+        .filter(status=ImageJob.PENDING, available_at__lte=now)
+        .order_by('available_at', 'id')
+        .values_list('id', flat=True)[:10]
+    )
+    for job_id in candidates:
+        claimed = ImageJob.objects.filter(
+            pk=job_id, status=ImageJob.PENDING
+        ).update(status=ImageJob.RUNNING, claimed_at=now, updated_at=now)
+        if claimed:
+            return ImageJob.objects.select_related('post').get(pk=job_id)
+    return None
+
+
+def release_stale_jobs(now=None):
+    """Возвращает в очередь задачи, воркер которых не отчитался за
+    BLOG_IMAGE_JOB_LEASE секунд: скорее всего, он упал.
+
+    Такой запуск считается неудачной попыткой, чтобы изображение, которое
+    роняет воркер, не обрабатывалось бесконечно.
+    """
+    now = now or timezone.now()
+    stale = ImageJob.objects.filter(
+        Q(claimed_at__lt=lease_expired_before(now))
+        | Q(claimed_at__isnull=True),
+        status=ImageJob.RUNNING)
+    released = 0
+    for job in stale:
+        fields = failure_fields(job, JobLeaseExpired(), now)
+        if fields['status'] == ImageJob.PENDING:
+            # Срок аренды уже выдержан, ждать ещё и паузу незачем.
+            fields['available_at'] = now
+        # Условие на claimed_at не даёт двум воркерам засчитать одну
+        # попытку дважды.
+        released += ImageJob.objects.filter(
+            pk=job.pk, status=ImageJob.RUNNING, claimed_at=job.claimed_at
+        ).update(**fields)
+    return released
+
+
+def jpeg_orientation_segment(orientation):
+    exif = Image.Exif()
+    exif[ORIENTATION] = orientation
+    payload = exif.tobytes()
+    return b'\xff\xe1' + (len(payload) + 2).to_bytes(2, 'big') + payload
+
+
+def strip_jpeg_metadata(data, orientation=1):
+    """Вырезает сегменты с метаданными, не перекодируя изображение.
+
+    Из EXIF остаётся только ориентация, иначе снимок повернётся.
+    """
+    parts = [data[:2]]
+    replacement = (jpeg_orientation_segment(orientation)
+                   if orientation != 1 else b'')
+    position = 2
+    while position < len(data):
+        if data[position] != 0xFF:
+            raise ValueError('Повреждённый JPEG.')
+        marker = data[position + 1]
+        if marker == 0xFF:
+            position += 1
+            continue
+        if marker in (0xDA, 0xD9):
+            # Дальше идут сжатые данные изображения.
+            parts.append(data[position:])
+            break
+        length = int.from_bytes(data[position + 2:position + 4], 'big')
+        segment = data[position:position + 2 + length]
+        if marker in JPEG_METADATA_MARKERS:
+            parts.append(replacement)
+            replacement = b''
+        else:
+            parts.append(segment)
+        position += 2 + length
+    return b''.join(parts)
+
+
+def stripped_image_data(data):
+    """Файл без метаданных; None, если формат нельзя очистить без потерь."""
+    image = Image.open(BytesIO(data))
+    if image.format == 'JPEG':
+        return strip_jpeg_metadata(
+            data, image.getexif().get(ORIENTATION, 1))
+    if image.format == 'PNG' and not getattr(image, 'is_animated', False):
+        buffer = BytesIO()
+        image.save(buffer, format='PNG',
+                   **{name: image.info[name] for name in PNG_SAVE_PARAMS
+                      if name in image.info})
+        return buffer.getvalue()
+    return None
+
+
+def strip_metadata(post):
+    """Заменяет оригинал копией без метаданных.
+
+    Копия сохраняется под новым именем, и только после этого публикация
+    переключается на неё, так что сбой на любом шаге не теряет
+    загруженный файл. Возвращает True, если файл заменён.
+    """
+    image = post.image
+    with image.open('rb'):
+        data = image.read()
+    stripped = stripped_image_data(data)
+    if stripped is None or stripped == data:
+        return False
+    storage, old_name = image.storage, image.name
+    new_name = storage.save(old_name, ContentFile(stripped))
+    if not Post.objects.filter(pk=post.pk, image=old_name).update(
+            image=new_name):
+        # Пока шла обработка, автор загрузил другое изображение.
+        storage.delete(new_name)
+        return False
+    post.image = new_name
+    storage.delete(old_name)
+    delete_renditions(old_name)
+    return True
+
+
+def process_image_job(job):
+    post = job.post
+    if post.image:
+        strip_metadata(post)
+        generate_renditions(post.image, overwrite=True)
+    with transaction.atomic():
+        job.status = ImageJob.DONE
+        job.attempts += 1
+        job.last_error = ''
+        job.save(update_fields=('status', 'attempts', 'last_error',
+                                'updated_at'))
+        # Новые копии должны попасть в закэшированные карточки и страницы.
+        Post.objects.filter(pk=post.pk).update(updated_at=timezone.now())
+    purge_page_cache()
+
+
+def failure_fields(job, error, now=None):
+    now = now or timezone.now()
+    attempts = job.attempts + 1
+    fields = {
+        'attempts': attempts,
+        'last_error': f'{type(error).__name__}: {error}',
+        'updated_at': now,
+    }
+    if attempts >= getattr(settings, 'BLOG_IMAGE_JOB_MAX_ATTEMPTS', 3):
+        fields['status'] = ImageJob.FAILED
+    else:
+        fields['status'] = ImageJob.PENDING
+        fields['available_at'] = now + timedelta(
+            seconds=30 * 2 ** (attempts - 1))
+    return fields
+
+
+def fail_image_job(job, error):
+    fields = failure_fields(job, error)
+    for name, value in fields.items():
+        setattr(job, name, value)
+    job.save(update_fields=fields)
+
+
+def run_next_job():
+    """Выполняет одну задачу; возвращает False, если очередь пуста."""
+    job = claim_next_job()
+    if job is None:
+        return False
+    try:
+        process_image_job(job)
+    except Exception as error:
+        logger.exception('Ошибка обработки изображения публикации %s',
+                         job.post_id)
+        fail_image_job(job, error)
+    return True
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from blog.models import Post
+from blog.search import search_backend, search_posts
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает время полнотекстового поиска с поиском через LIKE '
+            'на текущих данных.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('queries', nargs='+')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--limit', type=int, default=10,
+                            help='Размер страницы результатов.')
+
+    def handle(self, *args, **options):
+        posts = Post.objects.filter(is_visible=True)
+        self.stdout.write(f'Индекс: {search_backend()}, '
+                          f'публикаций: {posts.count()}')
+        for query in options['queries']:
+            indexed = self.measure(
+                lambda: search_posts(query, posts), options)
+            like = self.measure(
+                lambda: posts.filter(Q(title__icontains=query)
+                                     | Q(text__icontains=query))
+                .order_by('-pub_date'),
+                options)
+            self.stdout.write(
+                f'{query!r}: индекс {indexed[0] * 1000:.2f} мс '
+                f'({indexed[1]} найдено), LIKE {like[0] * 1000:.2f} мс '
+                f'({like[1]} найдено)')
+
+    def measure(self, make_queryset, options):
+        """Среднее время подсчёта и выборки первой страницы."""
+        started = time.perf_counter()
+        for _ in range(options['repeat']):
+            queryset = make_queryset()
+            found = queryset.count()
+            list(queryset[:options['limit']])
+        return (time.perf_counter() - started) / options['repeat'], found
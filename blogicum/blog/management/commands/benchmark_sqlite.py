@@ -0,0 +1,139 @@
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from blog.sqlite import apply_sqlite_pragmas
+
+READ_SQL = (
+    'SELECT id, title, text, pub_date, author_id, category_id, location_id '
+    'FROM blog_post WHERE is_visible ORDER BY pub_date DESC LIMIT 10')
+WRITE_SQL = (
+    "INSERT INTO blog_comment (text, post_id, author_id, created_at) "
+    "VALUES ('benchmark', ?, ?, datetime('now'))")
+COUNT_SQL = (
+    'UPDATE blog_post SET comment_count = comment_count + 1 WHERE id = ?')
+
+
+class Workload:
+    """Читатели и писатели, одновременно работающие с копией базы."""
+
+    def __init__(self, path, pragmas, row, reconnect):
+        self.path = path
+        self.pragmas = pragmas
+        self.row = row
+        self.reconnect = reconnect
+        self.stats = {'read': [], 'write': [], 'locked': 0}
+        self.lock = threading.Lock()
+
+    def connect(self):
+        db = sqlite3.connect(self.path, isolation_level=None,
+                             check_same_thread=False)
+        apply_sqlite_pragmas(db, self.pragmas)
+        return db
+
+    def read(self, db):
+        db.execute(READ_SQL).fetchall()
+
+    def write(self, db):
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            db.execute(WRITE_SQL, (self.row[0], self.row[1]))
+            db.execute(COUNT_SQL, (self.row[0],))
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        db.execute('COMMIT')
+
+    def worker(self, kind, stop):
+        operation = getattr(self, kind)
+        db = None if self.reconnect else self.connect()
+        timings, locked = [], 0
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            current = db or self.connect()
+            try:
+                operation(current)
+                timings.append(time.perf_counter() - started)
+            except sqlite3.OperationalError:
+                locked += 1
+            finally:
+                if db is None:
+                    current.close()
+        if db is not None:
+            db.close()
+        with self.lock:
+            self.stats[kind] += timings
+            self.stats['locked'] += locked
+
+    def run(self, readers, writers, duration):
+        # journal_mode сохраняется в файле базы, остальное — на соединение.
+        self.connect().close()
+        stop = time.perf_counter() + duration
+        threads = [
+            threading.Thread(target=self.worker, args=(kind, stop))
+            for kind, count in (('read', readers), ('write', writers))
+            for _ in range(count)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.stats
+
+
+def summary(kind, timings, duration):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95)] if timings else 0
+    return (f'{kind} {len(timings) / duration:.0f} op/s '
+            f'(p95 {p95 * 1000:.1f} мс)')
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает профили PRAGMA SQLite (SQLITE_PROFILES) при '
+            'одновременном чтении лент и добавлении комментариев. '
+            'Работает с копиями базы, сама база не меняется.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'profiles', nargs='*', default=['default', 'production'])
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--duration', type=float, default=5.0)
+        parser.add_argument(
+            '--reconnect', action='store_true',
+            help='Новое соединение на каждую операцию, как при '
+                 'CONN_MAX_AGE = 0.')
+
+    def handle(self, *args, **options):
+        source = Path(connections['default'].settings_dict['NAME'])
+        if connections['default'].vendor != 'sqlite' or not source.exists():
+            raise CommandError('Нужна файловая база SQLite.')
+        with sqlite3.connect(source) as db:
+            row = db.execute(
+                'SELECT id, author_id FROM blog_post LIMIT 1').fetchone()
+        if row is None:
+            raise CommandError('В базе нет публикаций.')
+        for profile in options['profiles']:
+            if profile not in settings.SQLITE_PROFILES:
+                raise CommandError(f'Неизвестный профиль: {profile}')
+            with tempfile.TemporaryDirectory() as directory:
+                copy = Path(directory) / source.name
+                shutil.copyfile(source, copy)
+                workload = Workload(copy, settings.SQLITE_PROFILES[profile],
+                                    row, options['reconnect'])
+                stats = workload.run(options['readers'], options['writers'],
+                                     options['duration'])
+            self.report(profile, stats, options['duration'])
+
+    def report(self, profile, stats, duration):
+        parts = [summary(kind, stats[kind], duration)
+                 for kind in ('read', 'write')]
+        self.stdout.write(f'{profile}: ' + ', '.join(parts)
+                          + f', ошибок блокировки: {stats["locked"]}')
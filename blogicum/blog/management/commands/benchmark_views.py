@@ -0,0 +1,86 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.test import RequestFactory, override_settings
+from django.urls import resolve
+
+from blog import async_views, views
+
+VIEW_NAMES = {
+    'index': 'PostListView',
+    'category_posts': 'CategoryPostListView',
+    'profile': 'ProfileListView',
+    'post_detail': 'PostDetailView',
+}
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает пропускную способность синхронных и асинхронных '
+            'views блога при конкурентной нагрузке.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'urls', nargs='*', default=['/'],
+            help='Адреса лент или публикаций, по умолчанию — главная.')
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument(
+            '--page-cache', action='store_true',
+            help='Не отключать кэш страниц для анонимных посетителей.')
+
+    def handle(self, *args, **options):
+        if options['page_cache']:
+            return self.benchmark(options)
+        with override_settings(BLOG_PAGE_CACHE_TIMEOUT=0):
+            return self.benchmark(options)
+
+    def benchmark(self, options):
+        for url in options['urls']:
+            match = resolve(url)
+            view_name = VIEW_NAMES.get(match.url_name)
+            if view_name is None:
+                raise CommandError(f'{url}: поддерживаются только ленты и '
+                                   'страницы публикаций.')
+            sync_view = getattr(views, view_name).as_view()
+            async_view = getattr(async_views, view_name).as_view()
+            sync_rps = self.run_sync(sync_view, url, match.kwargs, options)
+            async_rps = asyncio.run(
+                self.run_async(async_view, url, match.kwargs, options))
+            self.stdout.write(
+                f'{url}: sync {sync_rps:.1f} req/s, '
+                f'async {async_rps:.1f} req/s '
+                f'({options["requests"]} запросов, '
+                f'{options["concurrency"]} одновременно)')
+
+    def make_request(self, url):
+        request = RequestFactory().get(url)
+        request.user = AnonymousUser()
+        request.session = {}
+        return request
+
+    def run_sync(self, view, url, kwargs, options):
+        def call(_):
+            try:
+                view(self.make_request(url), **kwargs).render()
+            finally:
+                close_old_connections()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options['concurrency']) as executor:
+            list(executor.map(call, range(options['requests'])))
+        return options['requests'] / (time.perf_counter() - started)
+
+    async def run_async(self, view, url, kwargs, options):
+        semaphore = asyncio.Semaphore(options['concurrency'])
+
+        async def call():
+            async with semaphore:
+                await view(self.make_request(url), **kwargs)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(call() for _ in range(options['requests'])))
+        return options['requests'] / (time.perf_counter() - started)
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from blog.export import (COMMENT_FIELDS, POST_FIELDS, comment_rows,
+                         csv_lines, export_records, jsonl_lines, post_rows)
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = ('Потоково выгружает публикации и комментарии в JSONL или CSV, '
+            'не загружая их в память целиком.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', choices=('jsonl', 'csv'), default='jsonl')
+        parser.add_argument(
+            '--only', choices=('posts', 'comments'),
+            help='Выгрузить только публикации или только комментарии; '
+                 'для CSV обязательно.')
+        parser.add_argument(
+            '--since',
+            help='Дата и время ISO 8601: публикации, изменённые с этого '
+                 'момента, и комментарии, добавленные с него.')
+        parser.add_argument('--output', help='По умолчанию — stdout.')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                raise CommandError(
+                    f'Некорректная дата --since: {options["since"]}')
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+        lines = self.lines(options, since)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8',
+                      newline='') as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
+
+    def lines(self, options, since):
+        chunk_size = options['chunk_size']
+        only = options['only']
+        if options['format'] == 'csv':
+            if only is None:
+                raise CommandError('Для CSV укажите --only posts или '
+                                   '--only comments.')
+            if only == 'posts':
+                return csv_lines(post_rows(since=since, chunk_size=chunk_size),
+                                 POST_FIELDS)
+            return csv_lines(comment_rows(since=since, chunk_size=chunk_size),
+                             COMMENT_FIELDS)
+        return jsonl_lines(export_records(
+            posts=Post.objects.none() if only == 'comments' else None,
+            comments=Comment.objects.none() if only == 'posts' else None,
+            since=since, chunk_size=chunk_size))
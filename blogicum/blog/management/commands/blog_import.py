@@ -0,0 +1,232 @@
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.python import Deserializer
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from blog.feeds import invalidate_feeds
+from blog.publication import sync_visibility
+
+READ_CHUNK_SIZE = 1 << 16
+
+
+def skip_separators(buffer, position):
+    while position < len(buffer) and buffer[position] in ' \t\r\n,':
+        position += 1
+    return position
+
+
+def read_array_start(stream):
+    """Читает файл до открывающей скобки и возвращает текст за ней.
+
+    Для пустого файла возвращает None.
+    """
+    buffer = ''
+    while True:
+        chunk = stream.read(READ_CHUNK_SIZE)
+        buffer = (buffer + chunk).lstrip()
+        if buffer:
+            if buffer[0] != '[':
+                raise CommandError('Ожидался JSON-массив объектов.')
+            return buffer[1:]
+        if not chunk:
+            return None
+
+
+def decode_buffer(decoder, buffer):
+    """Разбирает все целые элементы массива из начала buffer.
+
+    Возвращает элементы, недочитанный хвост буфера и признак того, что
+    массив закончился.
+    """
+    items = []
+    position = 0
+    while True:
+        position = skip_separators(buffer, position)
+        if position < len(buffer) and buffer[position] == ']':
+            return items, '', True
+        try:
+            item, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            return items, buffer[position:], False
+        items.append(item)
+
+
+def iter_json_array(stream):
+    """Поштучно отдаёт элементы JSON-массива, не читая файл целиком."""
+    decoder = json.JSONDecoder()
+    buffer = read_array_start(stream)
+    while buffer is not None:
+        items, buffer, finished = decode_buffer(decoder, buffer)
+        yield from items
+        if finished:
+            return
+        chunk = stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            if buffer.strip():
+                raise CommandError('Файл обрывается посреди объекта.')
+            return
+        buffer += chunk
+
+
+def iter_json_lines(stream):
+    for line_number, line in enumerate(stream, start=1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as error:
+                raise CommandError(f'Строка {line_number}: {error}')
+
+
+@contextmanager
+def keep_timestamps(fields):
+    """Временно отключает auto_now и auto_now_add у полей."""
+    flags = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in flags:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = ('Потоково загружает фикстуры в формате dumpdata (JSON-массив) '
+            'или JSONL. Новые строки вставляются пакетами, существующие '
+            'перезаписываются, как у loaddata.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+')
+        parser.add_argument(
+            '--format', choices=('json', 'jsonl'),
+            help='По умолчанию определяется по расширению файла.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            '--skip-derived', action='store_true',
+            help='Не пересчитывать comment_count, is_visible и поисковый '
+                 'индекс публикаций.')
+
+    def handle(self, *args, **options):
+        self.using = options['database']
+        self.batch_size = options['batch_size']
+        self.batches = defaultdict(list)
+        self.totals = defaultdict(int)
+        self.loaded = 0
+        self.started = time.perf_counter()
+        connection = connections[self.using]
+
+        with transaction.atomic(using=self.using):
+            # Как и loaddata: ссылки проверяются один раз в конце, поэтому
+            # порядок моделей в файле не важен.
+            with connection.constraint_checks_disabled():
+                for path in options['paths']:
+                    self.load_file(path, options['format'])
+                self.flush_all()
+            connection.check_constraints(
+                table_names=[model._meta.db_table for model in self.totals])
+            self.reset_sequences(connection)
+
+        elapsed = time.perf_counter() - self.started
+        for model, count in self.totals.items():
+            self.stdout.write(f'{model._meta.label}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено объектов: {self.loaded} за {elapsed:.1f} с '
+            f'({self.loaded / max(elapsed, 1e-9):.0f} объектов/с)'))
+
+        if not options['skip_derived']:
+            call_command('recount_comments', stdout=self.stdout)
+            call_command('rebuild_search_index', stdout=self.stdout)
+            sync_visibility()
+        invalidate_feeds()
+
+    def load_file(self, path, data_format):
+        data_format = data_format or (
+            'jsonl' if path.endswith('.jsonl') else 'json')
+        reader = iter_json_lines if data_format == 'jsonl' else iter_json_array
+        with open(path, encoding='utf-8') as stream:
+            for deserialized in Deserializer(
+                    reader(stream), using=self.using,
+                    ignorenonexistent=True):
+                self.add(deserialized)
+
+    def add(self, deserialized):
+        model = type(deserialized.object)
+        batch = self.batches[model]
+        batch.append(deserialized)
+        if len(batch) >= self.batch_size:
+            self.flush(model)
+
+    def flush_all(self):
+        for model in list(self.batches):
+            self.flush(model)
+
+    def flush(self, model):
+        batch = self.batches.pop(model, [])
+        if not batch:
+            return
+        manager = model._base_manager.using(self.using)
+        existing = set(manager.filter(
+            pk__in=[item.object.pk for item in batch if item.object.pk]
+        ).values_list('pk', flat=True))
+        new_items = []
+        for item in batch:
+            if item.object.pk in existing:
+                # Как у loaddata: уже существующие строки перезаписываются.
+                item.save(using=self.using)
+            else:
+                new_items.append(item)
+        self.insert(model, [item.object for item in new_items])
+        self.insert_m2m(model, new_items)
+        self.totals[model] += len(batch)
+        self.loaded += len(batch)
+        elapsed = time.perf_counter() - self.started
+        self.stdout.write(
+            f'{model._meta.label}: +{len(batch)}, всего {self.loaded} '
+            f'({self.loaded / max(elapsed, 1e-9):.0f} объектов/с)')
+
+    def insert(self, model, objs):
+        timestamps = [
+            field for field in model._meta.local_concrete_fields
+            if getattr(field, 'auto_now', False)
+            or getattr(field, 'auto_now_add', False)
+        ]
+        now = timezone.now()
+        for obj in objs:
+            for field in timestamps:
+                if getattr(obj, field.attname) is None:
+                    setattr(obj, field.attname, now)
+        # Как у loaddata: даты создания и изменения берутся из файла, а не
+        # перезаписываются текущим временем.
+        with keep_timestamps(timestamps):
+            model._base_manager.using(self.using).bulk_create(
+                objs, batch_size=self.batch_size)
+
+    def insert_m2m(self, model, items):
+        rows_by_field = defaultdict(list)
+        for item in items:
+            for field_name, values in (item.m2m_data or {}).items():
+                field = model._meta.get_field(field_name)
+                through = field.remote_field.through
+                rows_by_field[field_name].extend(through(**{
+                    f'{field.m2m_field_name()}_id': item.object.pk,
+                    f'{field.m2m_reverse_field_name()}_id': value,
+                }) for value in values)
+        for field_name, rows in rows_by_field.items():
+            through = model._meta.get_field(field_name).remote_field.through
+            through._base_manager.using(self.using).bulk_create(
+                rows, batch_size=self.batch_size)
+
+    def reset_sequences(self, connection):
+        statements = connection.ops.sequence_reset_sql(
+            self.style.__class__(), list(self.totals))
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
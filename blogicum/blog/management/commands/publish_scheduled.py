@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.publication import next_publication_date, sync_visibility
+
+
+class Command(BaseCommand):
+    help = ('Показывает в лентах отложенные публикации, дата которых '
+            'наступила, и скрывает снятые с публикации.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--watch', action='store_true',
+            help='Работать постоянно, просыпаясь к ближайшей публикации.')
+        parser.add_argument(
+            '--interval', type=float, default=60,
+            help='Максимальная пауза между проверками в режиме --watch, с.')
+
+    def handle(self, *args, **options):
+        while True:
+            changed = sync_visibility()
+            if changed or options['verbosity'] > 1:
+                self.stdout.write(f'Обновлено публикаций: {changed}')
+            if not options['watch']:
+                return
+            time.sleep(self.seconds_to_next_run(options['interval']))
+
+    def seconds_to_next_run(self, interval):
+        now = timezone.now()
+        upcoming = next_publication_date(now)
+        if upcoming is None:
+            return interval
+        return max(0.0, min(interval, (upcoming - now).total_seconds()))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = ('Заново заполняет полнотекстовый индекс публикаций, например '
+            'после массовой загрузки в обход сигналов.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            indexed = rebuild_search_index()
+        self.stdout.write(
+            self.style.SUCCESS(f'Проиндексировано публикаций: {indexed}'))
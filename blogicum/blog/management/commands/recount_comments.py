@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённое количество комментариев у публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'post_ids', nargs='*', type=int,
+            help='Идентификаторы публикаций; по умолчанию — все.')
+
+    def handle(self, *args, **options):
+        counts = (
+            Comment.objects.filter(post=OuterRef('pk'))
+            .order_by().values('post').annotate(total=Count('pk'))
+            .values('total'))
+        posts = Post.objects.all()
+        if options['post_ids']:
+            posts = posts.filter(pk__in=options['post_ids'])
+        with transaction.atomic():
+            updated = posts.update(
+                comment_count=Coalesce(Subquery(counts), 0))
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано публикаций: {updated}'))
@@ -0,0 +1,32 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = ('Копирует основную базу SQLite в файлы реплик '
+            '(BLOG_REPLICA_DATABASES) для проверки чтения с реплик '
+            'на локальной машине.')
+
+    def handle(self, *args, **options):
+        if connections['default'].vendor != 'sqlite':
+            raise CommandError('Команда работает только с SQLite.')
+        aliases = settings.BLOG_REPLICA_DATABASES
+        if not aliases:
+            raise CommandError('Реплики не заданы: укажите BLOGICUM_REPLICAS.')
+        source = sqlite3.connect(connections['default'].settings_dict['NAME'])
+        try:
+            for alias in aliases:
+                connections[alias].close()
+                target = sqlite3.connect(
+                    connections[alias].settings_dict['NAME'])
+                try:
+                    # backup() даёт согласованную копию даже во время записи.
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(f'{alias}: обновлена.')
+        finally:
+            source.close()
@@ -0,0 +1,50 @@
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from blog.jobs import run_next_job
+
+
+class Command(BaseCommand):
+    help = 'Запускает воркеры фоновой обработки изображений публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Число процессов-воркеров.')
+        parser.add_argument(
+            '--poll-interval', type=float, default=2,
+            help='Пауза при пустой очереди, с.')
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Завершиться, когда очередь опустеет.')
+
+    def handle(self, *args, **options):
+        if options['workers'] <= 1:
+            return self.work(options['poll_interval'], options['burst'])
+        # Дочерние процессы не должны делить соединение с родителем.
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(
+                target=self.work,
+                args=(options['poll_interval'], options['burst']))
+            for _ in range(options['workers'])
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+    def work(self, poll_interval, burst):
+        processed = 0
+        while True:
+            if run_next_job():
+                processed += 1
+                close_old_connections()
+                continue
+            if burst:
+                break
+            time.sleep(poll_interval)
+        self.stdout.write(f'Обработано задач: {processed}')
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import profiling
+from .routers import pin_to_primary, replicas
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+class PrimaryPinMiddleware:
+    """Закрепляет чтения за основной базой после успешной записи."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (request.method not in SAFE_METHODS
+                and response.status_code < 400 and replicas()):
+            pin_to_primary(response)
+        return response
+
+
+class ProfilingMiddleware:
+    """Замеры каждого запроса для blog.profiling, если BLOG_PROFILING."""
+
+    def __init__(self, get_response):
+        if not settings.BLOG_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        profiling.enable()
+
+    def __call__(self, request):
+        return profiling.profile_request(self.get_response, request)
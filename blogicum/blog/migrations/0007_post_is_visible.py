@@ -0,0 +1,45 @@
+# Generated by Django 3.2.16 on 2026-10-15 22:35
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_is_visible(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.filter(
+        is_published=True,
+        category__is_published=True,
+        pub_date__lte=timezone.now(),
+    ).update(is_visible=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_updated_at'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_feed_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_category_feed_idx',
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='is_visible',
+            field=models.BooleanField(default=False, editable=False, help_text='Опубликовано, категория опубликована и дата публикации наступила; поддерживается командой publish_scheduled.', verbose_name='Показывается в лентах'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_visible', True)), fields=['-pub_date'], name='post_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_visible', True)), fields=['category', '-pub_date'], name='post_category_feed_idx'),
+        ),
+        migrations.RunPython(fill_is_visible, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations
+
+# Выражение индекса должно совпадать с тем, что строит
+# SearchVector('title', 'text', config='russian') в blog.search.
+POSTGRES_INDEX = (
+    "CREATE INDEX post_search_idx ON blog_post USING GIN ("
+    "to_tsvector('russian'::regconfig, "
+    "COALESCE(title, '') || ' ' || COALESCE(text, '')))"
+)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE blog_post_fts USING fts5("
+            "title, text, tokenize = 'unicode61 remove_diacritics 2')")
+        schema_editor.execute(
+            'INSERT INTO blog_post_fts (rowid, title, text) '
+            'SELECT id, title, text FROM blog_post')
+        # Вес совпадения в заголовке в десять раз больше, чем в тексте.
+        schema_editor.execute(
+            "INSERT INTO blog_post_fts (blog_post_fts, rank) "
+            "VALUES ('rank', 'bm25(10.0, 1.0)')")
+    elif vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_INDEX)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE blog_post_fts')
+    elif vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX post_search_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_imagejob'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.16 on 2026-10-15 23:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_imagejob_claimed_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'created_at', 'id'], name='comment_post_page_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 User = get_user_model()
 
@@ -71,7 +72,9 @@ class Post(BaseModel):
         User,
         on_delete=models.CASCADE,
         related_name='posts',
-        verbose_name='Автор публикации'
+        verbose_name='Автор публикации',
+        # Поиск по автору покрывает составной индекс post_author_feed_idx.
+        db_index=False,
     )
     location = models.ForeignKey(
         Location,
@@ -89,14 +92,58 @@ class Post(BaseModel):
     image = models.ImageField(verbose_name='Фото',
                               blank=True,
                               upload_to='posts_images')
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
+    is_visible = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Показывается в лентах',
+        help_text='Опубликовано, категория опубликована и дата публикации '
+                  'наступила; поддерживается командой publish_scheduled.'
+    )
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
+        indexes = (
+            models.Index(
+                fields=('-pub_date',),
+                name='post_feed_idx',
+                condition=models.Q(is_visible=True),
+            ),
+            models.Index(
+                fields=('category', '-pub_date'),
+                name='post_category_feed_idx',
+                condition=models.Q(is_visible=True),
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_feed_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # comment_count меняют только сигналы комментариев через F(), поэтому
+        # обычное сохранение не записывает прочитанное раньше значение.
+        if (not self._state.adding and self.pk is not None
+                and not kwargs.get('force_insert')
+                and kwargs.get('update_fields') is None):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'comment_count'
+            ]
+        super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     text = models.TextField(verbose_name='Комментарий')
@@ -116,6 +163,57 @@ class Comment(models.Model):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
+        indexes = (
+            # Порядок курсорной пагинации комментариев (paginate_comments).
+            models.Index(fields=('post', 'created_at', 'id'),
+                         name='comment_post_page_idx'),
+        )
 
     def __str__(self):
         return self.text[:COMMENT_MAX_LENGTH]
+
+
+class ImageJob(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Готово'),
+        (FAILED, 'Ошибка'),
+    )
+
+    post = models.ForeignKey(Post,
+                             verbose_name='Публикация',
+                             on_delete=models.CASCADE,
+                             related_name='image_jobs')
+    status = models.CharField(max_length=16,
+                              choices=STATUS_CHOICES,
+                              default=PENDING,
+                              verbose_name='Статус')
+    attempts = models.PositiveSmallIntegerField(default=0,
+                                                verbose_name='Попыток')
+    last_error = models.TextField(blank=True,
+                                  verbose_name='Последняя ошибка')
+    available_at = models.DateTimeField(default=timezone.now,
+                                        verbose_name='Выполнить не раньше')
+    claimed_at = models.DateTimeField(null=True, blank=True,
+                                      verbose_name='Взята в работу')
+    created_at = models.DateTimeField(auto_now_add=True,
+                                      verbose_name='Создано')
+    updated_at = models.DateTimeField(auto_now=True,
+                                      verbose_name='Изменено')
+
+    class Meta:
+        verbose_name = 'обработка изображения'
+        verbose_name_plural = 'Обработка изображений'
+        ordering = ('-created_at',)
+        indexes = (
+            models.Index(fields=('status', 'available_at'),
+                         name='imagejob_queue_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.post_id}: {self.get_status_display()}'
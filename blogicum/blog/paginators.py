@@ -0,0 +1,144 @@
+import base64
+import json
+from functools import reduce
+
+from django.db.models import Q
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def _cursor_value(value):
+    # DjangoJSONEncoder обрезает микросекунды, а курсору нужна точная дата.
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+class KeysetPage:
+    """Страница keyset-пагинации.
+
+    В отличие от django.core.paginator.Page не знает ни своего номера,
+    ни общего числа страниц: соседние страницы адресуются курсорами.
+    """
+
+    def __init__(self, object_list, paginator, next_cursor=None,
+                 previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<KeysetPage of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Пагинация по ключу сортировки (seek method) без COUNT(*) и OFFSET.
+
+    ordering должен однозначно упорядочивать строки, поэтому последним
+    полем в нём обычно идёт первичный ключ.
+    """
+
+    def __init__(self, object_list, per_page, ordering=('-pub_date', '-id')):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [name.lstrip('-') for name in self.ordering]
+
+    def encode_cursor(self, direction, obj):
+        values = [_cursor_value(getattr(obj, field)) for field in self.fields]
+        payload = json.dumps([direction, values])
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, values = json.loads(
+                base64.urlsafe_b64decode(padded.encode()))
+            if direction not in ('next', 'prev'):
+                raise ValueError(direction)
+            if len(values) != len(self.fields):
+                raise ValueError(values)
+            model_meta = self.object_list.model._meta
+            values = [
+                model_meta.get_field(field).to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except Exception as error:
+            raise InvalidCursor(cursor) from error
+        return direction, values
+
+    def _seek_filter(self, values, forward):
+        """Условие «строго после (или до) values» в порядке self.ordering.
+
+        Для ('-pub_date', '-id') и forward=True получается
+        pub_date < p OR (pub_date = p AND id < i).
+        """
+        conditions = []
+        for position, name in enumerate(self.ordering):
+            field = self.fields[position]
+            descending = name.startswith('-')
+            lookup = 'lt' if descending == forward else 'gt'
+            equal_prefix = {
+                prefix: value for prefix, value in zip(
+                    self.fields[:position], values[:position])
+            }
+            conditions.append(
+                Q(**equal_prefix, **{f'{field}__{lookup}': values[position]})
+            )
+        return reduce(lambda left, right: left | right, conditions)
+
+    def _reversed_ordering(self):
+        return [
+            name[1:] if name.startswith('-') else f'-{name}'
+            for name in self.ordering
+        ]
+
+    def page(self, cursor=None):
+        queryset = self.object_list
+        if not cursor:
+            rows = list(queryset.order_by(*self.ordering)[:self.per_page + 1])
+            has_next, has_previous = len(rows) > self.per_page, False
+            rows = rows[:self.per_page]
+        else:
+            direction, values = self.decode_cursor(cursor)
+            if direction == 'next':
+                rows = list(
+                    queryset.filter(self._seek_filter(values, forward=True))
+                    .order_by(*self.ordering)[:self.per_page + 1])
+                has_next, has_previous = len(rows) > self.per_page, True
+                rows = rows[:self.per_page]
+            else:
+                rows = list(
+                    queryset.filter(self._seek_filter(values, forward=False))
+                    .order_by(*self._reversed_ordering())[:self.per_page + 1])
+                has_next, has_previous = True, len(rows) > self.per_page
+                rows = rows[:self.per_page][::-1]
+        return KeysetPage(
+            rows,
+            self,
+            next_cursor=(self.encode_cursor('next', rows[-1])
+                         if has_next and rows else None),
+            previous_cursor=(self.encode_cursor('prev', rows[0])
+                             if has_previous and rows else None),
+        )
@@ -0,0 +1,250 @@
+"""Профилирование запросов по именам маршрутов.
+
+Включается настройкой BLOG_PROFILING; выключенный ProfilingMiddleware
+убирает себя из цепочки и ничего не подменяет. Для каждого маршрута
+(`blog:index`, `blog:post_detail`, …) копятся гистограммы времени ответа,
+числа и времени SQL-запросов, времени отрисовки шаблонов (вместе с
+запросами, которые шаблон выполняет сам) и, при BLOG_PROFILING_MEMORY,
+пикового прироста памяти — tracemalloc заметно замедляет работу, поэтому
+отдельно. Статистика своя у каждого процесса: её отдаёт `blog:profiling`
+для персонала, а раз в BLOG_PROFILING_DUMP_INTERVAL секунд она пишется в
+файл BLOG_PROFILING_DUMP_PATH.
+
+Замеры запроса лежат в contextvar, который sync_to_async переносит в
+потоки run_orm, поэтому счётчики одного запроса защищены блокировкой.
+Template.render подменяется только на время профилируемых запросов.
+"""
+import json
+import os
+import threading
+import time
+import tracemalloc
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.template.base import Template
+
+# Верхние границы корзин гистограмм; последняя корзина — всё, что больше.
+BUCKETS = {
+    'wall_ms': (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000),
+    'sql_count': (0, 1, 2, 3, 5, 10, 20, 50, 100),
+    'sql_ms': (1, 5, 10, 25, 50, 100, 250, 500, 1000),
+    'template_ms': (1, 5, 10, 25, 50, 100, 250, 500),
+    'memory_kb': (64, 256, 1024, 4096, 16384, 65536),
+}
+UNRESOLVED = '<unresolved>'
+
+_current = ContextVar('blog_request_profile', default=None)
+_template_depth = ContextVar('blog_template_depth', default=0)
+_lock = threading.Lock()
+_render_lock = threading.Lock()
+_render_users = 0
+_stats = {}
+_started = time.time()
+_last_dump = time.monotonic()
+_template_render = Template.render
+
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0
+        self.sum = 0
+        self.max = 0
+
+    def add(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Верхняя граница корзины, в которую попадает квантиль q."""
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= q * self.total:
+                return bound
+        return self.max
+
+    def as_dict(self):
+        buckets = {f'<={bound}': count
+                   for bound, count in zip(self.bounds, self.counts)}
+        buckets[f'>{self.bounds[-1]}'] = self.counts[-1]
+        return {
+            'count': self.total,
+            'mean': round(self.sum / self.total, 3) if self.total else 0,
+            'p50': self.quantile(0.5) if self.total else 0,
+            'p95': self.quantile(0.95) if self.total else 0,
+            'max': round(self.max, 3),
+            'buckets': buckets,
+        }
+
+
+class RequestProfile:
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.lock = threading.Lock()
+
+    def add_sql(self, elapsed):
+        with self.lock:
+            self.sql_count += 1
+            self.sql_time += elapsed
+
+    def add_template(self, elapsed):
+        with self.lock:
+            self.template_time += elapsed
+
+
+def profile_sql(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.add_sql(time.perf_counter() - started)
+
+
+def profile_template(self, context):
+    profile = _current.get()
+    # Вложенные шаблоны (include, extends) уже входят во внешний.
+    if profile is None or _template_depth.get():
+        return _template_render(self, context)
+    token = _template_depth.set(1)
+    started = time.perf_counter()
+    try:
+        return _template_render(self, context)
+    finally:
+        _template_depth.reset(token)
+        profile.add_template(time.perf_counter() - started)
+
+
+def instrument_connection(connection):
+    if profile_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(profile_sql)
+
+
+def instrument_thread():
+    """Замер SQL для соединений текущего потока, если запрос профилируется.
+
+    Потоки run_orm живут дольше запроса, и их соединения могли появиться
+    до включения профилирования, поэтому сигнала connection_created мало.
+    """
+    if _current.get() is not None:
+        for connection in connections.all():
+            instrument_connection(connection)
+
+
+def enable():
+    """Подключает замеры памяти; вызывается один раз при старте."""
+    if settings.BLOG_PROFILING_MEMORY and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+@contextmanager
+def profiled_templates():
+    """Подменяет Template.render, пока идёт хотя бы один такой блок."""
+    global _render_users
+    with _render_lock:
+        if not _render_users:
+            Template.render = profile_template
+        _render_users += 1
+    try:
+        yield
+    finally:
+        with _render_lock:
+            _render_users -= 1
+            if not _render_users:
+                Template.render = _template_render
+
+
+def profile_request(get_response, request):
+    profile = RequestProfile()
+    token = _current.set(profile)
+    instrument_thread()
+    memory = tracemalloc.is_tracing()
+    if memory:
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    started = time.perf_counter()
+    try:
+        with profiled_templates():
+            response = get_response(request)
+    finally:
+        _current.reset(token)
+    metrics = {
+        'wall_ms': (time.perf_counter() - started) * 1000,
+        'sql_count': profile.sql_count,
+        'sql_ms': profile.sql_time * 1000,
+        'template_ms': profile.template_time * 1000,
+    }
+    if memory:
+        # Пик общий для процесса: при параллельных запросах это оценка.
+        peak = tracemalloc.get_traced_memory()[1]
+        metrics['memory_kb'] = max(peak - baseline, 0) / 1024
+    match = getattr(request, 'resolver_match', None)
+    record(match.view_name if match else UNRESOLVED, metrics)
+    maybe_dump()
+    return response
+
+
+def record(view_name, metrics):
+    with _lock:
+        histograms = _stats.setdefault(view_name, {})
+        for metric, value in metrics.items():
+            if metric not in histograms:
+                histograms[metric] = Histogram(BUCKETS[metric])
+            histograms[metric].add(value)
+
+
+def snapshot():
+    with _lock:
+        views = {
+            view_name: {metric: histogram.as_dict()
+                        for metric, histogram in histograms.items()}
+            for view_name, histograms in _stats.items()
+        }
+    return {
+        'enabled': settings.BLOG_PROFILING,
+        'pid': os.getpid(),
+        'since': _started,
+        'views': views,
+    }
+
+
+def reset():
+    global _started
+    with _lock:
+        _stats.clear()
+        _started = time.time()
+
+
+def dump(path):
+    path = path.format(pid=os.getpid())
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as dump_file:
+        json.dump(snapshot(), dump_file, cls=DjangoJSONEncoder,
+                  ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(temporary, path)
+
+
+def maybe_dump():
+    global _last_dump
+    path = settings.BLOG_PROFILING_DUMP_PATH
+    if not path:
+        return
+    with _lock:
+        now = time.monotonic()
+        if now - _last_dump < settings.BLOG_PROFILING_DUMP_INTERVAL:
+            return
+        _last_dump = now
+    dump(path)
@@ -0,0 +1,62 @@
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache import purge_page_cache
+from .feeds import invalidate_feeds
+from .models import Category, Post
+
+
+def visible_q(now=None):
+    """Условие, при котором публикация должна быть видна в лентах."""
+    return Q(is_published=True,
+             category__is_published=True,
+             pub_date__lte=now or timezone.now())
+
+
+def category_is_published(post):
+    # Формы и админка присваивают публикации уже загруженную категорию;
+    # иначе хватает проверки флага без загрузки объекта.
+    if Post.category.is_cached(post):
+        return post.category.is_published
+    return Category.objects.filter(
+        pk=post.category_id, is_published=True).exists()
+
+
+def is_visible_now(post, now=None):
+    return bool(
+        post.is_published
+        and post.category_id is not None
+        and post.pub_date <= (now or timezone.now())
+        and category_is_published(post)
+    )
+
+
+def sync_visibility(posts=None, now=None):
+    """Приводит флаг is_visible в соответствие с правилами публикации.
+
+    Возвращает число публикаций, у которых флаг изменился. Если такие
+    есть, сбрасывает кэш страниц и материализованные ленты.
+    """
+    now = now or timezone.now()
+    if posts is None:
+        posts = Post.objects.all()
+    shown = posts.filter(visible_q(now), is_visible=False).update(
+        is_visible=True)
+    hidden = posts.filter(is_visible=True).exclude(visible_q(now)).update(
+        is_visible=False)
+    if shown or hidden:
+        purge_page_cache()
+        invalidate_feeds()
+    return shown + hidden
+
+
+def next_publication_date(now=None):
+    """Ближайшая отложенная дата публикации, которая ещё не наступила."""
+    return (
+        Post.objects
+        .filter(is_published=True, category__is_published=True,
+                is_visible=False, pub_date__gt=now or timezone.now())
+        .order_by('pub_date')
+        .values_list('pub_date', flat=True)
+        .first()
+    )
@@ -0,0 +1,97 @@
+"""Чтение лент и публикаций с реплик базы данных.
+
+Реплики перечислены в BLOG_REPLICA_DATABASES. На реплику уходят только
+запросы к моделям блога и только внутри views для чтения
+(ReplicaReadMixin); формы, запись, сессии и пользователи работают с
+основной базой. Пока у запроса есть метка PrimaryPinMiddleware, чтения
+тоже идут в основную базу: реплика может отставать, а автор должен сразу
+увидеть свою публикацию или комментарий.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_COOKIE = 'blog_primary'
+PIN_SALT = 'blog.routers.pin'
+
+_replica_reads = ContextVar('blog_replica_reads', default=False)
+
+
+def replicas():
+    return getattr(settings, 'BLOG_REPLICA_DATABASES', ())
+
+
+def reading_from_replica():
+    """Идут ли выборки блога в текущем контексте на реплику."""
+    return _replica_reads.get()
+
+
+def is_pinned(request):
+    # Подделанная, испорченная или просроченная метка — не закрепление.
+    return request.get_signed_cookie(
+        PIN_COOKIE, default=None, salt=PIN_SALT,
+        max_age=settings.BLOG_PRIMARY_PIN_SECONDS) is not None
+
+
+def pin_to_primary(response):
+    """Закрепляет чтения пользователя за основной базой на время задержки."""
+    seconds = settings.BLOG_PRIMARY_PIN_SECONDS
+    response.set_signed_cookie(PIN_COOKIE, '1', salt=PIN_SALT,
+                               max_age=seconds, httponly=True,
+                               samesite='Lax')
+    return response
+
+
+@contextmanager
+def replica_reads(request):
+    """Внутри блока модели блога читаются с реплик, если они есть."""
+    token = _replica_reads.set(bool(replicas()) and not is_pinned(request))
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReplicaReadMixin:
+    """Выборки view читаются с реплики; для views без записи."""
+
+    def dispatch(self, request, *args, **kwargs):
+        with replica_reads(request):
+            response = super().dispatch(request, *args, **kwargs)
+            # Шаблон дочитывает ленивые выборки, поэтому отрисовывается
+            # здесь, пока чтения ещё идут на реплику.
+            if getattr(response, 'is_rendered', True) is False:
+                response.render()
+            # Страница могла отстать от счётчика поколений: её нельзя
+            # класть в кэш страниц (см. anonymous_page_cache).
+            response.from_replica = reading_from_replica()
+            return response
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and model._meta.app_label == 'blog':
+            return random.choice(replicas())
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Объект, прочитанный с реплики, сохраняется в основную базу.
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db in replicas():
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии основной базы, объекты из них можно связывать.
+        dbs = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in dbs and obj2._state.db in dbs:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in replicas():
+            return False
+        return None
@@ -0,0 +1,113 @@
+"""Полнотекстовый поиск по заголовку и тексту публикаций.
+
+В SQLite индекс — виртуальная таблица FTS5 blog_post_fts, которую
+поддерживают сигналы и команда rebuild_search_index. В PostgreSQL —
+GIN-индекс по выражению to_tsvector, совпадающему с _search_vector().
+На остальных СУБД поиск сводится к icontains.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Post
+
+FTS_TABLE = 'blog_post_fts'
+SEARCH_CONFIG = 'russian'
+
+WORD_RE = re.compile(r'\w+')
+
+
+def search_backend():
+    if connection.vendor == 'sqlite':
+        return 'fts5'
+    if connection.vendor == 'postgresql':
+        return 'postgres'
+    return 'like'
+
+
+def fts_query(query):
+    """Запрос FTS5 из пользовательского ввода: все слова, по префиксу.
+
+    Слова берутся в кавычки, поэтому операторы FTS5 во вводе не
+    срабатывают и не приводят к синтаксической ошибке.
+    """
+    return ' '.join(f'"{word}"*' for word in WORD_RE.findall(query))
+
+
+def _search_vector():
+    from django.contrib.postgres.search import SearchVector
+    return SearchVector('title', 'text', config=SEARCH_CONFIG)
+
+
+def filter_posts(queryset, query):
+    """Оставляет в queryset публикации, подходящие под запрос."""
+    backend = search_backend()
+    if backend == 'fts5':
+        match = fts_query(query)
+        if not match:
+            return queryset.none()
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            (match,)))
+    if backend == 'postgres':
+        from django.contrib.postgres.search import SearchQuery
+        return queryset.annotate(search=_search_vector()).filter(
+            search=SearchQuery(query, config=SEARCH_CONFIG,
+                               search_type='websearch'))
+    return queryset.filter(Q(title__icontains=query)
+                           | Q(text__icontains=query))
+
+
+def search_posts(query, queryset=None):
+    """Подходящие публикации, самые релевантные — первыми."""
+    queryset = Post.objects.all() if queryset is None else queryset
+    backend = search_backend()
+    if backend == 'fts5':
+        match = fts_query(query)
+        if not match:
+            return queryset.none()
+        # rank считается по весам bm25, заданным в миграции (заголовок
+        # важнее): коррелированный подзапрос находит строку индекса по rowid.
+        return filter_posts(queryset, query).annotate(rank=RawSQL(
+            f'SELECT rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            f'AND rowid = {Post._meta.db_table}.id',
+            (match,))).order_by('rank', '-pub_date')
+    if backend == 'postgres':
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+        return filter_posts(queryset, query).annotate(rank=SearchRank(
+            _search_vector(),
+            SearchQuery(query, config=SEARCH_CONFIG, search_type='websearch'),
+        )).order_by('-rank', '-pub_date')
+    return filter_posts(queryset, query).order_by('-pub_date')
+
+
+def index_post(post):
+    if search_backend() != 'fts5':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', (post.pk,))
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+            'VALUES (%s, %s, %s)',
+            (post.pk, post.title, post.text))
+
+
+def unindex_post(post_id):
+    if search_backend() != 'fts5':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', (post_id,))
+
+
+def rebuild_search_index():
+    """Заполняет индекс заново; нужен после bulk_create и update()."""
+    if search_backend() != 'fts5':
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+            f'SELECT id, title, text FROM {Post._meta.db_table}')
+        return cursor.rowcount
@@ -0,0 +1,143 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import purge_page_cache
+from .feeds import feed_state, feeds_enabled, update_feeds
+from .models import Category, Comment, Location, Post
+from .profiling import instrument_connection
+from .publication import is_visible_now, sync_visibility
+from .search import index_post, unindex_post
+from .sqlite import tune_sqlite_connection
+
+
+connection_created.connect(tune_sqlite_connection)
+
+
+@receiver(connection_created)
+def profile_connection(sender, connection, **kwargs):
+    if getattr(settings, 'BLOG_PROFILING', False):
+        instrument_connection(connection)
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, **kwargs):
+    if created and not kwargs.get('raw'):
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1,
+            updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Comment)
+def touch_post_on_comment_edit(sender, instance, created, **kwargs):
+    # По updated_at строятся ETag страницы публикации и её JSON-версии.
+    if not created and not kwargs.get('raw'):
+        Post.objects.filter(pk=instance.post_id).update(
+            updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1,
+        updated_at=timezone.now())
+
+
+@receiver(pre_save, sender=Post)
+def fill_updated_at_on_raw_save(sender, instance, raw=False, **kwargs):
+    # loaddata сохраняет объекты в режиме raw, и auto_now не срабатывает.
+    if raw and instance.updated_at is None:
+        instance.updated_at = timezone.now()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Location)
+def touch_related_posts(sender, instance, created, **kwargs):
+    """Сбрасывает кэш карточек публикаций, которые показывают instance.
+
+    Ключ фрагмента в includes/post_card.html содержит updated_at поста,
+    поэтому достаточно обновить эту метку.
+    """
+    if created or kwargs.get('raw'):
+        return
+    lookup = 'category' if sender is Category else 'location'
+    Post.objects.filter(**{lookup: instance}).update(
+        updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def purge_cached_pages(sender, **kwargs):
+    # Имена авторов видны на страницах, а время входа — нет: его сохраняет
+    # update_last_login при каждом входе, и сброс всего кэша тут не нужен.
+    if kwargs.get('update_fields') == {'last_login'}:
+        return
+    purge_page_cache()
+
+
+@receiver(pre_save, sender=Post)
+def update_post_visibility(sender, instance, **kwargs):
+    instance.is_visible = is_visible_now(instance)
+
+
+@receiver(post_save, sender=Category)
+def update_category_posts_visibility(sender, instance, created, **kwargs):
+    if not created and not kwargs.get('raw'):
+        sync_visibility(Post.objects.filter(category=instance))
+
+
+@receiver(post_delete, sender=Category)
+def hide_uncategorized_posts(sender, instance, **kwargs):
+    sync_visibility(Post.objects.filter(category=None))
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or {'title', 'text'} & set(update_fields):
+        index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_post(instance.pk)
+
+
+@receiver(pre_save, sender=Post)
+def remember_feed_state(sender, instance, raw=False, **kwargs):
+    if not feeds_enabled() or raw:
+        return
+    instance._feed_state_before = None
+    if instance.pk is not None:
+        before = Post.objects.filter(pk=instance.pk).values(
+            'author_id', 'category_id', 'is_visible', 'pub_date').first()
+        if before is not None:
+            instance._feed_state_before = {'id': instance.pk, **before}
+
+
+@receiver(post_save, sender=Post)
+def update_materialized_feeds(sender, instance, raw=False, **kwargs):
+    if not feeds_enabled() or raw:
+        return
+    before = getattr(instance, '_feed_state_before', None)
+    after = feed_state(instance)
+    transaction.on_commit(lambda: update_feeds(before, after))
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_materialized_feeds(sender, instance, **kwargs):
+    if feeds_enabled():
+        before = feed_state(instance)
+        transaction.on_commit(lambda: update_feeds(before, None))
@@ -0,0 +1,20 @@
+"""Настройка соединений SQLite через PRAGMA.
+
+Набор PRAGMA задаёт BLOG_SQLITE_PRAGMAS — один из профилей
+SQLITE_PROFILES; сравнить профили под нагрузкой можно командой
+benchmark_sqlite.
+"""
+from django.conf import settings
+
+
+def apply_sqlite_pragmas(cursor, pragmas):
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def tune_sqlite_connection(sender, connection, **kwargs):
+    """Обработчик connection_created: выполняет BLOG_SQLITE_PRAGMAS."""
+    pragmas = getattr(settings, 'BLOG_SQLITE_PRAGMAS', None)
+    if connection.vendor == 'sqlite' and pragmas:
+        with connection.cursor() as cursor:
+            apply_sqlite_pragmas(cursor, pragmas)
@@ -0,0 +1,24 @@
+from django import template
+from django.conf import settings
+
+from blog.images import has_renditions, rendition_url, rendition_widths
+
+register = template.Library()
+
+
+@register.filter
+def rendition(image_file, width):
+    return rendition_url(image_file, int(width))
+
+
+@register.filter
+def srcset(image_file):
+    if not image_file:
+        return ''
+    if (not getattr(settings, 'BLOG_IMAGE_RENDITIONS_ON_REQUEST', False)
+            and not has_renditions(image_file)):
+        return ''
+    return ', '.join(
+        f'{rendition_url(image_file, width)} {width}w'
+        for width in rendition_widths()
+    )
@@ -1,18 +1,21 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import api, async_views, views
 
 app_name = 'blog'
 
+read_views = async_views if settings.BLOG_ASYNC_VIEWS else views
+
 urlpatterns = [
     path(
         '',
-        views.PostListView.as_view(),
+        read_views.PostListView.as_view(),
         name='index'
     ),
     path(
         'posts/<int:pk>/',
-        views.PostDetailView.as_view(),
+        read_views.PostDetailView.as_view(),
         name='post_detail'
     ),
     path(
@@ -30,6 +33,11 @@ urlpatterns = [
         views.PostDeleteView.as_view(),
         name='delete_post'
     ),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'
+    ),
     path(
         'posts/<int:post_id>/comment/',
         views.add_comment,
@@ -47,17 +55,47 @@ urlpatterns = [
     ),
     path(
         'category/<slug:category_slug>/',
-        views.CategoryPostListView.as_view(),
+        read_views.CategoryPostListView.as_view(),
         name='category_posts'
     ),
+    path(
+        'search/',
+        views.SearchListView.as_view(),
+        name='search'
+    ),
     path(
         'profile/<str:username>/',
-        views.ProfileListView.as_view(),
+        read_views.ProfileListView.as_view(),
         name='profile'
     ),
+    path(
+        'api/posts/',
+        api.PostListView.as_view(),
+        name='api_index'
+    ),
+    path(
+        'api/posts/<int:pk>/',
+        api.PostDetailView.as_view(),
+        name='api_post_detail'
+    ),
+    path(
+        'api/category/<slug:category_slug>/',
+        api.CategoryPostListView.as_view(),
+        name='api_category_posts'
+    ),
+    path(
+        'api/profile/<str:username>/',
+        api.ProfileListView.as_view(),
+        name='api_profile'
+    ),
     path(
         'edit_profile/<str:username>/',
         views.EditProfileUpdateView.as_view(),
         name='edit_profile'
     ),
+    path(
+        'profiling/',
+        views.profiling_stats,
+        name='profiling'
+    ),
 ]
@@ -1,22 +1,113 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.models import User
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.utils import timezone
+from django.utils.decorators import method_decorator
 from django.urls import reverse
 from django.views.generic import (
     ListView, DetailView, CreateView, UpdateView, DeleteView
 )
-from django.db.models import Count
-from django.http import Http404
-
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import Q
+from django.http import Http404, JsonResponse
+from django.utils.http import urlencode
+
+from .cache import anonymous_page_cache
+from .conditional import ConditionalGetMixin
+from .feeds import FEEDS, FeedSequence, feed_ids, feeds_enabled
 from .models import Post, Category, Comment
 from .forms import ProfileForm, PostForm, CommentForm
+from .jobs import enqueue_image_job
+from .paginators import InvalidCursor, KeysetPaginator
+from .profiling import snapshot
+from .routers import ReplicaReadMixin
+from .search import search_posts
 
 POSTS_ON_PAGE = 10
+COMMENTS_ON_PAGE = 20
+
+
+def visible_posts_q(user):
+    """Публикации, доступные пользователю: из лент и его собственные."""
+    visible = Q(is_visible=True)
+    if user.is_authenticated:
+        visible |= Q(author_id=user.id)
+    return visible
+
+
+def paginate_comments(post, cursor=None):
+    paginator = KeysetPaginator(
+        Comment.objects.filter(post=post).select_related('author'),
+        COMMENTS_ON_PAGE, ordering=('created_at', 'id'))
+    try:
+        return paginator.page(cursor)
+    except InvalidCursor:
+        raise Http404('Некорректный курсор комментариев.')
+
+
+class KeysetPaginationMixin:
+    keyset_pagination = None
+    keyset_ordering = ('-pub_date', '-id')
+    cursor_kwarg = 'cursor'
+
+    def use_keyset_pagination(self):
+        if self.keyset_pagination is None:
+            return getattr(settings, 'BLOG_KEYSET_PAGINATION', False)
+        return self.keyset_pagination
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_keyset_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(queryset, page_size,
+                                    ordering=self.keyset_ordering)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor:
+            raise Http404('Некорректный курсор страницы.')
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['paginator_template'] = (
+            'includes/paginator_keyset.html'
+            if self.use_keyset_pagination()
+            else 'includes/paginator.html')
+        return context
+
+
+class MaterializedFeedMixin:
+    """Пагинация по материализованной ленте из blog/feeds.py."""
 
+    feed_kind = None
 
-class PostListView(ListView):
+    def use_materialized_feed(self):
+        return True
+
+    def get_feed_owner_id(self):
+        raise ImproperlyConfigured(
+            f'{type(self).__name__} должен определить get_feed_owner_id().')
+
+    def get_feed_kind(self):
+        if self.feed_kind not in FEEDS:
+            raise ImproperlyConfigured(
+                f'{type(self).__name__}.feed_kind должен быть одним из: '
+                f'{", ".join(FEEDS)}.')
+        return self.feed_kind
+
+    def paginate_queryset(self, queryset, page_size):
+        if feeds_enabled() and self.use_materialized_feed():
+            queryset = FeedSequence(
+                feed_ids(self.get_feed_kind(), self.get_feed_owner_id()),
+                queryset)
+        return super().paginate_queryset(queryset, page_size)
+
+
+@method_decorator(anonymous_page_cache, name='dispatch')
+class PostListView(ReplicaReadMixin, ConditionalGetMixin,
+                   KeysetPaginationMixin, ListView):
     model = Post
     template_name = 'blog/index.html'
     paginate_by = POSTS_ON_PAGE
@@ -27,11 +118,7 @@ class PostListView(ListView):
                 'author',
                 'category',
                 'location')
-            .filter(
-                is_published=True,
-                category__is_published=True,
-                pub_date__lte=timezone.now())
-            .annotate(comment_count=Count('comments'))
+            .filter(is_visible=True)
             .order_by('-pub_date'))
 
 
@@ -40,11 +127,26 @@ class PostMixin:
     form_class = PostForm
     template_name = 'blog/create.html'
 
+    def form_valid(self, form):
+        # Задача обработки фиксируется вместе с публикацией или не
+        # появляется вовсе.
+        with transaction.atomic():
+            response = super().form_valid(form)
+            if 'image' in form.changed_data and self.object.image:
+                enqueue_image_job(self.object)
+        return response
+
 
 class DispatchPostMixin:
+    post_object = None
+
+    def get_object(self, queryset=None):
+        if self.post_object is None:
+            self.post_object = super().get_object(queryset)
+        return self.post_object
+
     def dispatch(self, request, *args, **kwargs):
-        instance = get_object_or_404(Post, pk=kwargs['pk'])
-        if instance.author != request.user:
+        if self.get_object().author_id != request.user.id:
             return redirect('blog:post_detail', pk=kwargs['pk'])
         return super().dispatch(request, *args, **kwargs)
 
@@ -75,73 +177,132 @@ class PostDeleteView(LoginRequiredMixin, PostMixin,
         return context
 
 
-class PostDetailView(DetailView):
+@method_decorator(anonymous_page_cache, name='dispatch')
+class PostDetailView(ReplicaReadMixin, ConditionalGetMixin, DetailView):
     model = Post
     template_name = 'blog/detail.html'
 
+    def get_queryset(self):
+        return (
+            Post.objects
+            .select_related('author', 'category', 'location')
+            .filter(visible_posts_q(self.request.user)))
+
     def get_object(self, queryset=None):
-        post_object = get_object_or_404(Post, pk=self.kwargs['pk'])
-        if post_object.author != self.request.user:
-            if (post_object.category.is_published
-                    and post_object.pub_date <= timezone.now()
-                    and post_object.is_published):
-                return post_object
-            raise Http404()
-        return post_object
+        return get_object_or_404(self.get_queryset(), pk=self.kwargs['pk'])
+
+    def get_comments(self):
+        return paginate_comments(self.object, self.request.GET.get('comments'))
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = (
-            Comment.objects.select_related('author')
-            .filter(post_id=self.kwargs['pk'])
-            .order_by('created_at'))
+        context['comments'] = self.get_comments()
         return context
 
 
-class CategoryPostListView(ListView):
+@method_decorator(anonymous_page_cache, name='dispatch')
+class CategoryPostListView(ReplicaReadMixin, ConditionalGetMixin,
+                           KeysetPaginationMixin, MaterializedFeedMixin,
+                           ListView):
     model = Category
     template_name = 'blog/category.html'
     paginate_by = POSTS_ON_PAGE
+    feed_kind = 'category'
+    category = None
+
+    def get(self, request, *args, **kwargs):
+        self.category = get_object_or_404(Category,
+                                          slug=self.kwargs['category_slug'],
+                                          is_published=True)
+        return super().get(request, *args, **kwargs)
 
     def get_queryset(self):
-        category = get_object_or_404(Category,
-                                     slug=self.kwargs['category_slug'],
-                                     is_published=True)
         return (
             Post.objects
-            .filter(is_published=True,
-                    category=category,
-                    pub_date__lte=timezone.now())
-            .annotate(comment_count=Count('comments'))
+            .select_related('author', 'location')
+            .filter(is_visible=True, category=self.category)
             .order_by('-pub_date'))
 
+    def get_feed_owner_id(self):
+        return self.category.id
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['category'] = Category.objects.get(
-            slug=self.kwargs['category_slug']
-        )
+        for post in context['page_obj']:
+            post.category = self.category
+        context['category'] = self.category
         return context
 
 
-class ProfileListView(ListView):
+@method_decorator(anonymous_page_cache, name='dispatch')
+class SearchListView(ListView):
+    model = Post
+    template_name = 'blog/search.html'
+    paginate_by = POSTS_ON_PAGE
+
+    def get_search_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self):
+        query = self.get_search_query()
+        if not query:
+            return Post.objects.none()
+        return search_posts(
+            query,
+            Post.objects.select_related('author', 'category', 'location')
+            .filter(is_visible=True))
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.get_search_query()
+        context['query'] = query
+        context['page_query'] = urlencode({'q': query}) + '&'
+        return context
+
+
+class ProfileListView(ReplicaReadMixin, ConditionalGetMixin,
+                      KeysetPaginationMixin, MaterializedFeedMixin,
+                      ListView):
     model = User
     paginate_by = POSTS_ON_PAGE
     template_name = 'blog/profile.html'
+    feed_kind = 'author'
+    profile = None
+
+    def is_owner(self):
+        return self.request.user.id == self.get_profile().id
 
     def get_queryset(self):
-        return (
+        posts = (
             Post.objects
-            .select_related('author')
-            .filter(author__username=self.kwargs['username'])
-            .annotate(comment_count=Count('comments'))
-            .order_by('-pub_date', ))
+            .select_related('category', 'location')
+            .filter(author_id=self.get_profile().id)
+            .order_by('-pub_date'))
+        # Автор видит все свои публикации, остальные — только из лент.
+        if not self.is_owner():
+            posts = posts.filter(is_visible=True)
+        return posts
+
+    def use_materialized_feed(self):
+        return not self.is_owner()
+
+    def get_feed_owner_id(self):
+        return self.get_profile().id
+
+    def get_profile(self):
+        if self.profile is None:
+            self.profile = get_object_or_404(
+                User, username=self.kwargs['username']
+            )
+        return self.profile
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['profile'] = get_object_or_404(
-            User, username=self.kwargs['username']
-        )
+        profile = self.get_profile()
+        for post in context['page_obj']:
+            post.author = profile
+        context['profile'] = profile
         return context
 
 
@@ -176,6 +337,34 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
                        kwargs={'pk': self.kwargs['post_id']})
 
 
+def comment_data(comment):
+    return {
+        'id': comment.id,
+        'author': comment.author.username,
+        'text': comment.text,
+        'created_at': comment.created_at,
+    }
+
+
+@anonymous_page_cache
+def post_comments(request, post_id):
+    """Следующая порция комментариев: HTML-фрагмент или JSON."""
+    post = get_object_or_404(
+        Post.objects.filter(visible_posts_q(request.user)), pk=post_id)
+    comments = paginate_comments(post, request.GET.get('cursor'))
+    if request.GET.get('format') == 'json':
+        next_url = None
+        if comments.has_next():
+            next_url = (reverse('blog:post_comments', args=(post.id,))
+                        + f'?format=json&cursor={comments.next_cursor}')
+        return JsonResponse({
+            'comments': [comment_data(comment) for comment in comments],
+            'next': next_url,
+        })
+    return render(request, 'includes/comment_list.html',
+                  {'post': post, 'comments': comments})
+
+
 @login_required
 def add_comment(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
@@ -184,7 +373,8 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        with transaction.atomic():
+            comment.save()
     return redirect('blog:post_detail', pk=post_id)
 
 
@@ -214,6 +404,13 @@ def delete_comment(request, post_id, comment_id):
         'comment': instance,
     }
     if request.method == 'POST':
-        instance.delete()
+        with transaction.atomic():
+            instance.delete()
         return redirect('blog:post_detail', pk=post_id)
     return render(request, 'blog/comment.html', context)
+
+
+@staff_member_required
+def profiling_stats(request):
+    """Гистограммы ProfilingMiddleware по маршрутам для этого процесса."""
+    return JsonResponse(snapshot(), json_dumps_params={'ensure_ascii': False})
@@ -30,12 +30,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'blog.middleware.PrimaryPinMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -68,9 +70,53 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Сколько секунд держать соединение открытым между запросами;
+        # 0 — новое соединение на каждый запрос.
+        'CONN_MAX_AGE': int(os.getenv('BLOGICUM_CONN_MAX_AGE', 0)),
     }
 }
 
+# PRAGMA, которые выполняются при каждом новом соединении с SQLite
+# (blog/signals.py). Профиль выбирается переменной BLOGICUM_SQLITE_PROFILE.
+# production: WAL, чтобы комментарии не блокировали чтение лент,
+# synchronous=NORMAL (в режиме WAL надёжно при сбое процесса),
+# отображение файла в память, кэш страниц 64 МБ и ожидание блокировки
+# вместо мгновенной ошибки «database is locked». Вместе с ним стоит задать
+# BLOGICUM_CONN_MAX_AGE, чтобы PRAGMA не выполнялись на каждый запрос.
+# Сравнить профили: `manage.py benchmark_sqlite`.
+SQLITE_PROFILES = {
+    'default': {},
+    'production': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,
+        'busy_timeout': 5000,
+        'temp_store': 'MEMORY',
+    },
+}
+BLOG_SQLITE_PRAGMAS = SQLITE_PROFILES[
+    os.getenv('BLOGICUM_SQLITE_PROFILE', 'default')]
+
+# Реплики для чтения лент и публикаций (blog/routers.py): пути к копиям
+# базы SQLite через запятую в BLOGICUM_REPLICAS. Локально копии обновляет
+# `manage.py refresh_replicas`. После записи пользователь читает из основной
+# базы BLOG_PRIMARY_PIN_SECONDS секунд, чтобы сразу видеть свои изменения.
+# Страницы, прочитанные с реплики, не кэшируются и не получают ETag:
+# счётчик поколений уже учитывает запись, до которой реплика могла ещё не
+# дойти, и устаревшая страница жила бы до следующей правки.
+for number, path in enumerate(
+        filter(None, os.getenv('BLOGICUM_REPLICAS', '').split(',')), 1):
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'NAME': path.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+BLOG_REPLICA_DATABASES = [
+    alias for alias in DATABASES if alias.startswith('replica')]
+BLOG_PRIMARY_PIN_SECONDS = int(os.getenv('BLOG_PRIMARY_PIN_SECONDS', 10))
+DATABASE_ROUTERS = ['blog.routers.ReplicaRouter']
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -124,3 +170,96 @@ MEDIA_ROOT = BASE_DIR / 'media'
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+
+# Пагинация лент по ключу (pub_date, id) вместо OFFSET и COUNT(*).
+BLOG_KEYSET_PAGINATION = False
+
+# Списки публикаций категорий и авторов в кэше (blog/feeds.py): страница
+# ленты — срез списка и один запрос in_bulk. При keyset-пагинации
+# не используются.
+BLOG_MATERIALIZED_FEEDS = os.getenv('BLOG_MATERIALIZED_FEEDS', '') == '1'
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+#
+# По умолчанию кэш хранится в файлах и общий для всех воркеров gunicorn
+# на одной машине. Бэкенд выбирается переменной окружения BLOGICUM_CACHE:
+# file, database (нужен `manage.py createcachetable`), memcached
+# (нужен pymemcache), redis (нужен django-redis) или locmem.
+# BLOGICUM_DEPLOY_ID входит в префикс ключей: при выкладке с новым
+# идентификатором все ранее закэшированные данные разом перестают
+# использоваться.
+#
+# Файловый, табличный и locmem-кэши при переполнении удаляют треть записей
+# наугад, в том числе счётчики поколений страниц и лент. Стандартного
+# предела в 300 записей не хватает даже на страницы одного поколения,
+# поэтому он поднят (BLOGICUM_CACHE_MAX_ENTRIES). Цена — место на диске и
+# то, что файловый кэш при каждой записи сверх предела просматривает весь
+# каталог: предел должен быть с запасом больше рабочего набора.
+
+DEPLOY_ID = os.getenv('BLOGICUM_DEPLOY_ID', 'dev')
+CACHE_MAX_ENTRIES = int(os.getenv('BLOGICUM_CACHE_MAX_ENTRIES', 50000))
+
+CACHE_BACKENDS = {
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('BLOGICUM_CACHE_LOCATION', BASE_DIR / 'cache'),
+        'OPTIONS': {'MAX_ENTRIES': CACHE_MAX_ENTRIES},
+    },
+    'database': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': os.getenv('BLOGICUM_CACHE_LOCATION', 'blogicum_cache'),
+        'OPTIONS': {'MAX_ENTRIES': CACHE_MAX_ENTRIES},
+    },
+    'memcached': {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': os.getenv('BLOGICUM_CACHE_LOCATION', '127.0.0.1:11211'),
+    },
+    'redis': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': os.getenv('BLOGICUM_CACHE_LOCATION',
+                              'redis://127.0.0.1:6379/1'),
+    },
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {'MAX_ENTRIES': CACHE_MAX_ENTRIES},
+    },
+}
+
+CACHES = {
+    'default': {
+        **CACHE_BACKENDS[os.getenv('BLOGICUM_CACHE', 'file')],
+        'KEY_PREFIX': f'blogicum:{DEPLOY_ID}',
+        'TIMEOUT': int(os.getenv('BLOGICUM_CACHE_TIMEOUT', 300)),
+    },
+}
+
+# Время жизни кэша страниц ленты, категорий и публикаций для анонимных
+# посетителей, в секундах; 0 отключает кэширование.
+BLOG_PAGE_CACHE_TIMEOUT = int(os.getenv('BLOG_PAGE_CACHE_TIMEOUT', 60))
+
+# Асинхронные views для лент и публикаций (blog/async_views.py).
+# blogicum/asgi.py включает их по умолчанию.
+BLOG_ASYNC_VIEWS = os.getenv('BLOG_ASYNC_VIEWS', '') == '1'
+BLOG_ASYNC_ORM_WORKERS = int(os.getenv('BLOG_ASYNC_ORM_WORKERS', 8))
+
+# Уменьшенные копии изображений публикаций (blog/images.py).
+BLOG_IMAGE_RENDITION_WIDTHS = (320, 640, 960)
+BLOG_IMAGE_RENDITION_FORMAT = 'WEBP'
+BLOG_IMAGE_RENDITION_QUALITY = 80
+# Копии создаёт очередь `manage.py run_image_jobs`; True — создавать
+# недостающие копии прямо во время запроса.
+BLOG_IMAGE_RENDITIONS_ON_REQUEST = False
+BLOG_IMAGE_JOB_MAX_ATTEMPTS = 3
+# Через сколько секунд задачу упавшего воркера можно взять снова.
+BLOG_IMAGE_JOB_LEASE = 600
+
+# Профилирование запросов по маршрутам (blog/profiling.py). Статистика —
+# на /profiling/ для персонала и в JSON-файле BLOG_PROFILING_DUMP_PATH
+# ({pid} заменяется номером процесса) раз в BLOG_PROFILING_DUMP_INTERVAL
+# секунд. BLOG_PROFILING_MEMORY добавляет пиковую память через tracemalloc.
+BLOG_PROFILING = os.getenv('BLOG_PROFILING', '') == '1'
+BLOG_PROFILING_MEMORY = os.getenv('BLOG_PROFILING_MEMORY', '') == '1'
+BLOG_PROFILING_DUMP_PATH = os.getenv('BLOG_PROFILING_DUMP_PATH', '')
+BLOG_PROFILING_DUMP_INTERVAL = int(
+    os.getenv('BLOG_PROFILING_DUMP_INTERVAL', 60))
@@ -19,6 +19,7 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -41,6 +42,28 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(scope="session", autouse=True)
+def isolated_cache():
+    # Файловый кэш из настроек общий для всех запусков и копий репозитория,
+    # поэтому тесты работают с кэшем в памяти и без кэша страниц. Тесты
+    # кэша страниц включают его сами.
+    with override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "blogicum-tests",
+            }
+        },
+        BLOG_PAGE_CACHE_TIMEOUT=0,
+    ):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -363,6 +386,7 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
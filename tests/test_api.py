@@ -0,0 +1,122 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+from blog.models import Post
+from blog.publication import sync_visibility
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed(mixer, user, published_category, published_location):
+    cache.clear()
+    now = timezone.now()
+    return mixer.cycle(15).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+        is_published=True,
+        pub_date=(now - timedelta(hours=i) for i in range(15)),
+    )
+
+
+def test_api_index_pages(client, feed):
+    ids = []
+    url = "/api/posts/"
+    while url:
+        data = client.get(url).json()
+        ids += [post["id"] for post in data["results"]]
+        url = data["next"]
+    assert ids == [post.id for post in feed], (
+        "Убедитесь, что лента API листается курсорами от новых публикаций"
+        " к старым без пропусков."
+    )
+    first = client.get("/api/posts/").json()["results"][0]
+    assert first["author"] == feed[0].author.username
+    assert first["category"]["slug"] == feed[0].category.slug
+
+
+def test_api_returns_not_modified(
+        client, feed, django_assert_max_num_queries):
+    response = client.get("/api/posts/")
+    etag = response["ETag"]
+    assert response.has_header("Last-Modified")
+
+    # Не больше агрегатного запроса для валидаторов, без выборки страницы.
+    with django_assert_max_num_queries(1):
+        cached = client.get("/api/posts/", HTTP_IF_NONE_MATCH=etag)
+    assert cached.status_code == 304, (
+        "Убедитесь, что на запрос с актуальным ETag возвращается код 304."
+    )
+    not_modified = client.get(
+        "/api/posts/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+    )
+    assert not_modified.status_code == 304
+
+
+def test_api_etag_follows_changes(client, mixer, feed):
+    post = feed[0]
+    detail_etag = client.get(f"/api/posts/{post.id}/")["ETag"]
+    feed_etag = client.get("/api/posts/")["ETag"]
+
+    comment = mixer.blend("blog.Comment", post=post)
+    response = client.get(
+        f"/api/posts/{post.id}/", HTTP_IF_NONE_MATCH=detail_etag
+    )
+    assert response.status_code == 200, (
+        "Убедитесь, что новый комментарий меняет ETag публикации."
+    )
+    assert response.json()["comments"][0]["id"] == comment.id
+    assert client.get(
+        "/api/posts/", HTTP_IF_NONE_MATCH=feed_etag
+    ).status_code == 200
+
+    detail_etag = response["ETag"]
+    comment.text = "Edited"
+    comment.save()
+    assert client.get(
+        f"/api/posts/{post.id}/", HTTP_IF_NONE_MATCH=detail_etag
+    ).status_code == 200, (
+        "Убедитесь, что правка комментария меняет ETag публикации."
+    )
+
+    feed_etag = client.get("/api/posts/")["ETag"]
+    feed[-1].delete()
+    assert client.get(
+        "/api/posts/", HTTP_IF_NONE_MATCH=feed_etag
+    ).status_code == 200, (
+        "Убедитесь, что удаление публикации меняет ETag ленты."
+    )
+
+
+def test_api_etag_follows_scheduled_publication(client, feed):
+    post = feed[0]
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() + timedelta(days=1), is_visible=False)
+    feed_etag = client.get("/api/posts/")["ETag"]
+    # Одна публикация появляется, другая скрывается: число публикаций и
+    # самая поздняя правка в ленте не меняются.
+    Post.objects.filter(pk=post.pk).update(pub_date=timezone.now())
+    Post.objects.filter(pk=feed[1].pk).update(is_published=False)
+    sync_visibility()
+    response = client.get("/api/posts/", HTTP_IF_NONE_MATCH=feed_etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что публикация по расписанию меняет ETag ленты."
+    )
+    assert response.json()["results"][0]["id"] == post.id
+
+
+def test_api_hides_invisible_posts(client, feed, published_category):
+    post = feed[0]
+    Post.objects.filter(pk=post.pk).update(is_visible=False)
+    assert client.get(f"/api/posts/{post.id}/").status_code == 404
+    ids = [
+        item["id"] for item in client.get(
+            f"/api/category/{published_category.slug}/"
+        ).json()["results"]
+    ]
+    assert post.id not in ids
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory
+
+from blog import async_views, views
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+def get_sync_and_async(view_name, url, **kwargs):
+    request = RequestFactory().get(url)
+    request.user = AnonymousUser()
+    request.session = {}
+    sync_response = getattr(views, view_name).as_view()(request, **kwargs)
+    sync_response.render()
+    async_view = getattr(async_views, view_name).as_view()
+    assert asyncio.iscoroutinefunction(async_view)
+    async_response = async_to_sync(async_view)(request, **kwargs)
+    return sync_response, async_response
+
+
+@pytest.mark.parametrize(
+    "view_name", ["PostListView", "CategoryPostListView", "ProfileListView",
+                  "PostDetailView"]
+)
+def test_async_views_match_sync(
+        view_name, settings, many_posts_with_published_locations):
+    settings.BLOG_PAGE_CACHE_TIMEOUT = 0
+    post = many_posts_with_published_locations[0]
+    kwargs, url = {
+        "PostListView": ({}, "/"),
+        "CategoryPostListView": (
+            {"category_slug": post.category.slug},
+            f"/category/{post.category.slug}/"),
+        "ProfileListView": (
+            {"username": post.author.username},
+            f"/profile/{post.author.username}/"),
+        "PostDetailView": ({"pk": post.pk}, f"/posts/{post.pk}/"),
+    }[view_name]
+    sync_response, async_response = get_sync_and_async(
+        view_name, url, **kwargs)
+    assert async_response.status_code == sync_response.status_code == 200
+    assert async_response.content == sync_response.content
+
+
+def test_async_views_return_not_modified(
+        settings, many_posts_with_published_locations):
+    settings.BLOG_PAGE_CACHE_TIMEOUT = 0
+    sync_response, async_response = get_sync_and_async("PostListView", "/")
+    assert async_response["ETag"] == sync_response["ETag"]
+    request = RequestFactory().get(
+        "/", HTTP_IF_NONE_MATCH=sync_response["ETag"]
+    )
+    request.user = AnonymousUser()
+    request.session = {}
+    response = async_to_sync(async_views.PostListView.as_view())(request)
+    assert response.status_code == 304, (
+        "Убедитесь, что асинхронные views тоже отвечают 304 на запрос"
+        " с актуальным ETag."
+    )
+
+
+def test_async_post_detail_fetches_post_and_comments_concurrently(
+        settings, monkeypatch, post_with_published_location):
+    settings.BLOG_PAGE_CACHE_TIMEOUT = 0
+    post = post_with_published_location
+    request = RequestFactory().get(f"/posts/{post.pk}/")
+    request.user = AnonymousUser()
+    request.session = {}
+    # Барьер на двоих пропустит только одновременные выборки.
+    barrier = threading.Barrier(2, timeout=5)
+    get_object = async_views.PostDetailView.get_object
+    paginate_comments = views.paginate_comments
+
+    def waiting_get_object(self, *args, **kwargs):
+        barrier.wait()
+        return get_object(self, *args, **kwargs)
+
+    def waiting_paginate_comments(*args, **kwargs):
+        barrier.wait()
+        return paginate_comments(*args, **kwargs)
+
+    monkeypatch.setattr(
+        async_views.PostDetailView, "get_object", waiting_get_object)
+    monkeypatch.setattr(views, "paginate_comments", waiting_paginate_comments)
+    response = async_to_sync(async_views.PostDetailView.as_view())(
+        request, pk=post.pk)
+    assert response.status_code == 200, (
+        "Убедитесь, что асинхронная страница публикации выбирает публикацию"
+        " и первую порцию комментариев одновременно."
+    )
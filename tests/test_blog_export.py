@@ -0,0 +1,74 @@
+import csv
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def export(*args):
+    out = StringIO()
+    call_command("blog_export", *args, stdout=out)
+    return out.getvalue()
+
+
+def test_export_jsonl(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    records = [json.loads(line) for line in export().splitlines()]
+    assert [record["type"] for record in records] == [
+        "post", "comment", "comment"
+    ]
+    assert records[0]["id"] == post.id
+    assert records[0]["author"] == post.author.username, (
+        "Убедитесь, что в выгрузку публикации попадает имя автора."
+    )
+    assert {record["post_id"] for record in records[1:]} == {post.id}
+
+
+def test_export_since(mixer, post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(
+        updated_at=timezone.now() - timedelta(days=2)
+    )
+    since = (timezone.now() - timedelta(days=1)).isoformat()
+    assert export("--since", since, "--only", "posts") == "", (
+        "Убедитесь, что с параметром --since выгружаются только"
+        " изменённые с этого момента публикации."
+    )
+    comment = mixer.blend("blog.Comment", post=post)
+    records = [
+        json.loads(line) for line in export("--since", since).splitlines()
+    ]
+    assert [(record["type"], record["id"]) for record in records] == [
+        ("post", post.id), ("comment", comment.id)
+    ], "Новый комментарий обновляет дату изменения публикации."
+
+
+def test_export_csv(post_with_published_location):
+    rows = list(csv.DictReader(
+        StringIO(export("--format", "csv", "--only", "posts"))
+    ))
+    assert len(rows) == 1
+    assert rows[0]["title"] == post_with_published_location.title
+
+
+def test_admin_export_action(admin_client, post_with_published_location):
+    post = post_with_published_location
+    response = admin_client.post(
+        "/admin/blog/post/",
+        {"action": "export_jsonl", "_selected_action": [post.id]},
+    )
+    assert response.status_code == 200
+    assert response.streaming
+    records = [
+        json.loads(line)
+        for line in b"".join(response.streaming_content).splitlines()
+    ]
+    assert records[0]["id"] == post.id
@@ -0,0 +1,112 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from blog.management.commands import blog_import
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+CREATED_AT = "2022-12-18T23:06:18.993Z"
+
+
+def fixture_rows(user):
+    # Публикации идут раньше категории и комментариев: ссылки проверяются
+    # только в конце загрузки.
+    posts = [
+        {
+            "model": "blog.post",
+            "pk": 100 + i,
+            "fields": {
+                "title": f"Imported {i}",
+                "text": "Text",
+                "pub_date": "2022-12-18T23:00:00Z",
+                "author": user.id,
+                "category": 100,
+                "location": None,
+                "is_published": True,
+                "created_at": CREATED_AT,
+            },
+        }
+        for i in range(5)
+    ]
+    category = {
+        "model": "blog.category",
+        "pk": 100,
+        "fields": {
+            "title": "Imported",
+            "description": "Description",
+            "slug": "imported",
+            "is_published": True,
+            "created_at": CREATED_AT,
+        },
+    }
+    comments = [
+        {
+            "model": "blog.comment",
+            "pk": 100 + i,
+            "fields": {
+                "text": "Comment",
+                "post": 100,
+                "author": user.id,
+                "created_at": CREATED_AT,
+            },
+        }
+        for i in range(3)
+    ]
+    return posts + [category] + comments
+
+
+@pytest.mark.parametrize("suffix", ["json", "jsonl"])
+def test_blog_import(tmp_path, monkeypatch, user, suffix):
+    # Маленький буфер, чтобы объекты разрывались между порциями чтения.
+    monkeypatch.setattr(blog_import, "READ_CHUNK_SIZE", 7)
+    rows = fixture_rows(user)
+    path = tmp_path / f"dump.{suffix}"
+    if suffix == "json":
+        path.write_text(json.dumps(rows, indent=2), encoding="utf-8")
+    else:
+        path.write_text(
+            "\n".join(json.dumps(row) for row in rows), encoding="utf-8"
+        )
+
+    call_command(
+        "blog_import", str(path), "--batch-size", "2", stdout=StringIO()
+    )
+
+    assert Post.objects.filter(pk__gte=100).count() == 5
+    assert Comment.objects.filter(pk__gte=100).count() == 3
+    post = Post.objects.get(pk=100)
+    assert post.created_at.isoformat().startswith("2022-12-18T23:06:18.993"), (
+        "Убедитесь, что при импорте сохраняется дата создания из файла."
+    )
+    assert post.comment_count == 3, (
+        "Убедитесь, что после импорта пересчитывается количество комментариев."
+    )
+    assert post.is_visible and post.updated_at is not None, (
+        "Убедитесь, что после импорта заполняются поля is_visible и"
+        " updated_at."
+    )
+
+
+def test_blog_import_updates_existing_rows(tmp_path, user):
+    rows = fixture_rows(user)
+    path = tmp_path / "dump.json"
+    path.write_text(json.dumps(rows), encoding="utf-8")
+    call_command("blog_import", str(path), stdout=StringIO())
+    rows[0]["fields"]["title"] = "Updated"
+    path.write_text(json.dumps(rows), encoding="utf-8")
+    call_command("blog_import", str(path), stdout=StringIO())
+    assert Post.objects.get(pk=100).title == "Updated"
+    assert Post.objects.filter(pk__gte=100).count() == 5
+
+
+def test_blog_import_rejects_truncated_file(tmp_path, monkeypatch, user):
+    monkeypatch.setattr(blog_import, "READ_CHUNK_SIZE", 7)
+    path = tmp_path / "dump.json"
+    path.write_text(json.dumps(fixture_rows(user))[:-40], encoding="utf-8")
+    with pytest.raises(CommandError, match="обрывается"):
+        call_command("blog_import", str(path), stdout=StringIO())
+    assert not Post.objects.filter(pk__gte=100).exists()
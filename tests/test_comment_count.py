@@ -0,0 +1,52 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(
+        user_client, post_with_published_location):
+    post = post_with_published_location
+    for text in ("first", "second"):
+        user_client.post(f"/posts/{post.id}/comment/", {"text": text})
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что при добавлении комментария увеличивается"
+        " сохранённое количество комментариев публикации."
+    )
+
+    comment = Comment.objects.filter(post=post).first()
+    user_client.post(f"/posts/{post.id}/delete_comment/{comment.id}/")
+    post.refresh_from_db()
+    assert post.comment_count == 1
+
+    Comment.objects.filter(post=post).delete()
+    post.refresh_from_db()
+    assert post.comment_count == 0
+
+
+def test_recount_comments_command(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=42)
+    call_command("recount_comments", stdout=StringIO())
+    post.refresh_from_db()
+    assert post.comment_count == 3
+
+
+def test_post_save_keeps_concurrent_comment_count(
+        mixer, post_with_published_location):
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    mixer.blend("blog.Comment", post=post)
+    post.title = "Правка во время обсуждения"
+    post.save()
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что сохранение публикации не затирает количество"
+        " комментариев, добавленных после её загрузки."
+    )
+    assert post.title == "Правка во время обсуждения"
@@ -0,0 +1,72 @@
+import pytest
+
+from blog.models import Comment, Post
+from blog.views import COMMENTS_ON_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+N_COMMENTS = COMMENTS_ON_PAGE * 2 + 5
+
+
+@pytest.fixture
+def comments(mixer, post_with_published_location):
+    mixer.cycle(N_COMMENTS).blend(
+        "blog.Comment", post=post_with_published_location
+    )
+    return list(
+        Comment.objects.filter(post=post_with_published_location)
+        .order_by("created_at", "id")
+        .values_list("id", flat=True)
+    )
+
+
+def test_detail_shows_first_comment_page(
+        client, post_with_published_location, comments,
+        django_assert_num_queries):
+    post = post_with_published_location
+    with django_assert_num_queries(2):
+        response = client.get(f"/posts/{post.id}/")
+    page = response.context["comments"]
+    assert [comment.id for comment in page] == comments[:COMMENTS_ON_PAGE], (
+        "Убедитесь, что на странице публикации показывается только первая"
+        " порция комментариев."
+    )
+    assert f"/posts/{post.id}/comments/?cursor={page.next_cursor}" in (
+        response.content.decode()
+    )
+
+
+def test_comment_fragments_cover_all_comments(
+        client, post_with_published_location, comments):
+    post = post_with_published_location
+    seen = []
+    url = f"/posts/{post.id}/comments/?format=json"
+    while url:
+        data = client.get(url).json()
+        seen += [comment["id"] for comment in data["comments"]]
+        url = data["next"]
+    assert seen == comments, (
+        "Убедитесь, что порции комментариев идут по порядку, без пропусков"
+        " и повторов."
+    )
+
+    first = client.get(f"/posts/{post.id}/")
+    cursor = first.context["comments"].next_cursor
+    fragment = client.get(f"/posts/{post.id}/comments/", {"cursor": cursor})
+    assert fragment.status_code == 200
+    html = fragment.content.decode()
+    assert "<html" not in html
+    assert f'name="comment_{comments[COMMENTS_ON_PAGE]}"' in html
+
+
+def test_comment_endpoint_hides_invisible_posts(
+        client, post_with_published_location, comments):
+    post = post_with_published_location
+    assert client.get(
+        f"/posts/{post.id}/comments/", {"cursor": "broken"}
+    ).status_code == 404
+    Post.objects.filter(pk=post.pk).update(is_visible=False)
+    assert client.get(f"/posts/{post.id}/comments/").status_code == 404, (
+        "Убедитесь, что комментарии скрытой публикации недоступны"
+        " посторонним."
+    )
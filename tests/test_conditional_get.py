@@ -0,0 +1,93 @@
+import pytest
+from django.core.cache import cache
+from django.test import Client
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def urls(post_with_published_location):
+    cache.clear()
+    post = post_with_published_location
+    return [
+        "/",
+        f"/posts/{post.id}/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    ]
+
+
+def test_html_views_return_not_modified(
+        client, urls, django_assert_num_queries):
+    for url in urls:
+        response = client.get(url)
+        assert response.has_header("ETag") and response.has_header(
+            "Last-Modified"
+        ), f"Убедитесь, что страница `{url}` отдаёт ETag и Last-Modified."
+        with django_assert_num_queries(0):
+            not_modified = client.get(
+                url, HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+        assert not_modified.status_code == 304, (
+            f"Убедитесь, что страница `{url}` с актуальным ETag отдаёт"
+            " код 304 без запросов к базе данных."
+        )
+
+
+def test_html_etag_changes_with_content(
+        client, mixer, urls, post_with_published_location):
+    etags = {url: client.get(url)["ETag"] for url in urls}
+    mixer.blend("blog.Comment", post=post_with_published_location)
+    for url, etag in etags.items():
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+            f"Убедитесь, что ETag страницы `{url}` меняется после"
+            " изменения данных."
+        )
+
+
+def test_html_etag_depends_on_user(client, user_client, urls):
+    for url in urls:
+        etag = client.get(url)["ETag"]
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            "Убедитесь, что ETag зависит от пользователя: иначе после входа"
+            " браузер покажет страницу, сохранённую для гостя."
+        )
+        user_etag = response["ETag"]
+        assert user_client.get(
+            url, HTTP_IF_NONE_MATCH=user_etag
+        ).status_code == 304
+
+
+def test_html_etag_changes_after_profile_edit(
+        user_client, user, post_with_published_location):
+    url = f"/profile/{user.username}/"
+    etag = user_client.get(url)["ETag"]
+    user.first_name = "Новое имя"
+    user.save()
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что ETag страницы меняется после правки профиля."
+    )
+    assert "Новое имя" in response.content.decode()
+
+
+def test_login_changes_only_own_etag(client, user, urls):
+    anonymous_etags = {url: client.get(url)["ETag"] for url in urls}
+    first, second = Client(), Client()
+    first.force_login(user)
+    etags = {url: first.get(url)["ETag"] for url in urls}
+    second.force_login(user)
+    for url in urls:
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=anonymous_etags[url]
+        ).status_code == 304, (
+            "Убедитесь, что вход пользователя не сбрасывает ETag страниц"
+            " для остальных посетителей."
+        )
+        assert second.get(
+            url, HTTP_IF_NONE_MATCH=etags[url]
+        ).status_code == 200, (
+            "Убедитесь, что после нового входа страница не отдаётся с"
+            " кодом 304: в ней должен быть свежий CSRF-токен."
+        )
@@ -0,0 +1,171 @@
+from datetime import timedelta
+from io import BytesIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.files.storage import default_storage
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image
+
+from blog.images import (
+    delete_renditions, generate_renditions, has_renditions, rendition_name
+)
+from blog.jobs import (
+    enqueue_image_job, run_next_job, strip_metadata, stripped_image_data
+)
+from blog.models import ImageJob, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def post_with_large_image(mixer, user, published_category):
+    exif = Image.Exif()
+    exif[0x010F] = "Camera maker"
+    img_io = BytesIO()
+    Image.new("RGB", (2000, 1000), color=(73, 109, 137)).save(
+        img_io, format="JPEG", exif=exif)
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=ImageFile(img_io, name="large_image.jpg"),
+    )
+    yield post
+    post.refresh_from_db()
+    delete_renditions(post.image.name)
+    default_storage.delete(post.image.name)
+
+
+def test_renditions_are_resized_and_stripped(post_with_large_image):
+    names = generate_renditions(post_with_large_image.image)
+    for width, name in names.items():
+        with default_storage.open(name) as rendition_file:
+            rendition = Image.open(rendition_file)
+            assert rendition.size == (width, width // 2)
+            assert not rendition.getexif(), (
+                "Убедитесь, что из уменьшенных копий изображений удаляются"
+                " метаданные EXIF."
+            )
+
+
+def test_post_card_uses_srcset(client, post_with_large_image):
+    image = post_with_large_image.image
+    content = client.get("/").content.decode()
+    assert rendition_name(image.name, 320) not in content
+
+    generate_renditions(image)
+    post_with_large_image.save()
+    content = client.get("/").content.decode()
+    assert rendition_name(image.name, 320) in content
+    assert "srcset=" in content
+
+
+def test_image_job_lifecycle(post_with_large_image):
+    post = post_with_large_image
+    job = enqueue_image_job(post)
+    assert run_next_job()
+    job.refresh_from_db()
+    assert job.status == ImageJob.DONE
+    post.refresh_from_db()
+    assert has_renditions(post.image)
+    with default_storage.open(post.image.name) as original:
+        assert not Image.open(original).getexif(), (
+            "Убедитесь, что фоновая обработка удаляет EXIF из оригинала."
+        )
+    assert not run_next_job()
+
+
+def test_failed_image_job_is_retried(post_with_large_image):
+    post = post_with_large_image
+    job = enqueue_image_job(post)
+    default_storage.delete(post.image.name)
+    run_next_job()
+    job.refresh_from_db()
+    assert job.status == ImageJob.PENDING
+    assert job.attempts == 1
+    assert job.last_error
+    assert job.available_at > timezone.now()
+
+
+def test_post_form_enqueues_image_job(
+        user_client, published_category, published_location):
+    img_io = BytesIO()
+    Image.new("RGB", (50, 50)).save(img_io, format="JPEG")
+    img_io.seek(0)
+    img_io.name = "upload.jpg"
+    response = user_client.post("/posts/create/", {
+        "title": "С картинкой",
+        "text": "Текст",
+        "pub_date": "2020-01-01T10:00",
+        "category": published_category.id,
+        "location": published_location.id,
+        "is_published": True,
+        "image": img_io,
+    })
+    assert response.status_code == 302
+    post = Post.objects.get(title="С картинкой")
+    assert ImageJob.objects.filter(
+        post=post, status=ImageJob.PENDING).count() == 1, (
+        "Убедитесь, что после загрузки изображения создаётся задача его"
+        " фоновой обработки."
+    )
+
+
+def test_stale_running_job_is_reclaimed(post_with_large_image, settings):
+    settings.BLOG_IMAGE_JOB_LEASE = 60
+    job = enqueue_image_job(post_with_large_image)
+    ImageJob.objects.filter(pk=job.pk).update(
+        status=ImageJob.RUNNING,
+        claimed_at=timezone.now() - timedelta(minutes=5),
+    )
+    assert run_next_job(), (
+        "Убедитесь, что задачу упавшего воркера можно взять снова после"
+        " истечения срока аренды."
+    )
+    job.refresh_from_db()
+    assert job.status == ImageJob.DONE
+    assert job.attempts == 2
+
+
+def test_metadata_is_stripped_without_reencoding(post_with_large_image):
+    post = post_with_large_image
+    with default_storage.open(post.image.name) as original:
+        data = original.read()
+    old_name = post.image.name
+    assert strip_metadata(post)
+    assert post.image.name != old_name
+    assert not default_storage.exists(old_name)
+    post.refresh_from_db()
+    with default_storage.open(post.image.name) as stripped_file:
+        stripped = stripped_file.read()
+    assert not Image.open(BytesIO(stripped)).getexif()
+    assert (
+        Image.open(BytesIO(stripped)).tobytes()
+        == Image.open(BytesIO(data)).tobytes()
+    ), "Убедитесь, что удаление EXIF не перекодирует JPEG с потерями."
+
+
+def test_jpeg_orientation_is_kept():
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    exif[0x010F] = "Camera maker"
+    buffer = BytesIO()
+    Image.new("RGB", (20, 10)).save(buffer, format="JPEG", exif=exif)
+    stripped = Image.open(BytesIO(stripped_image_data(buffer.getvalue())))
+    assert dict(stripped.getexif()) == {0x0112: 6}
+
+
+def test_animated_gif_is_left_alone(post_with_large_image):
+    frames = [Image.new("P", (10, 10), color) for color in (1, 2)]
+    buffer = BytesIO()
+    frames[0].save(buffer, format="GIF", save_all=True,
+                   append_images=frames[1:])
+    assert stripped_image_data(buffer.getvalue()) is None
+    post = post_with_large_image
+    name = default_storage.save("posts_images/anim.gif",
+                                ContentFile(buffer.getvalue()))
+    default_storage.delete(post.image.name)
+    Post.objects.filter(pk=post.pk).update(image=name)
+    post.refresh_from_db()
+    assert not strip_metadata(post)
+    assert post.image.name == name
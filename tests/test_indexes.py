@@ -0,0 +1,74 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import RequestFactory
+
+from blog.models import Comment
+from blog.paginators import KeysetPaginator
+from blog.views import (
+    COMMENTS_ON_PAGE, CategoryPostListView, PostListView, ProfileListView
+)
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def explain_query_plan(queryset) -> str:
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return "\n".join(str(row[-1]) for row in cursor.fetchall())
+
+
+def feed_queryset(view_cls, **kwargs):
+    request = RequestFactory().get("/")
+    request.user = AnonymousUser()
+    view = view_cls()
+    view.setup(request, **kwargs)
+    return view.get_queryset()[:N_PER_PAGE]
+
+
+@pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="EXPLAIN QUERY PLAN is SQLite-only"
+)
+@pytest.mark.parametrize(
+    ("view_cls", "index_name"),
+    [
+        (PostListView, "post_feed_idx"),
+        (CategoryPostListView, "post_category_feed_idx"),
+        (ProfileListView, "post_author_feed_idx"),
+    ],
+    ids=["index", "category", "profile"],
+)
+def test_feed_uses_index(
+        view_cls, index_name, user, published_category):
+    kwargs = {
+        CategoryPostListView: {"category_slug": published_category.slug},
+        ProfileListView: {"username": user.username},
+    }.get(view_cls, {})
+    plan = explain_query_plan(feed_queryset(view_cls, **kwargs))
+    assert f"USING INDEX {index_name}" in plan, (
+        f"Убедитесь, что запрос ленты `{view_cls.__name__}` использует"
+        f" индекс `{index_name}`. План запроса:\n{plan}"
+    )
+
+
+@pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="EXPLAIN QUERY PLAN is SQLite-only"
+)
+def test_comment_page_uses_index(post_with_published_location):
+    paginator = KeysetPaginator(
+        Comment.objects.filter(post=post_with_published_location)
+        .select_related("author"),
+        COMMENTS_ON_PAGE, ordering=("created_at", "id"),
+    )
+    queryset = paginator.object_list.order_by(*paginator.ordering)
+    plan = explain_query_plan(queryset[:COMMENTS_ON_PAGE + 1])
+    assert "USING INDEX comment_post_page_idx" in plan, (
+        "Убедитесь, что страница комментариев выбирается по индексу"
+        f" `comment_post_page_idx`. План запроса:\n{plan}"
+    )
+    assert "TEMP B-TREE" not in plan, (
+        "Убедитесь, что комментарии публикации не сортируются целиком."
+        f" План запроса:\n{plan}"
+    )
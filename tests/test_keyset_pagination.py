@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.models import Post
+from blog.paginators import KeysetPaginator
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def same_date_posts(mixer, user, published_category):
+    pub_date = timezone.now() - timedelta(days=1)
+    return mixer.cycle(N_PER_PAGE * 2 + 3).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=pub_date,
+    )
+
+
+def test_keyset_paginator_walks_forward_and_back(same_date_posts):
+    paginator = KeysetPaginator(Post.objects.all(), N_PER_PAGE)
+    expected = list(Post.objects.order_by("-pub_date", "-id"))
+
+    seen = []
+    pages = []
+    page = paginator.page()
+    assert not page.has_previous()
+    while True:
+        pages.append(page)
+        seen.extend(page.object_list)
+        if not page.has_next():
+            break
+        page = paginator.page(page.next_cursor)
+    assert seen == expected, (
+        "Убедитесь, что keyset-пагинация обходит все публикации ровно один"
+        " раз и в правильном порядке, в том числе при совпадающих датах."
+    )
+
+    previous = paginator.page(pages[-1].previous_cursor)
+    assert list(previous) == list(pages[-2])
+    assert previous.has_next() and previous.has_previous()
+
+
+def test_keyset_pagination_in_views(same_date_posts, client):
+    with override_settings(BLOG_KEYSET_PAGINATION=True):
+        response = client.get("/")
+        assert response.status_code == 200
+        page = response.context["page_obj"]
+        assert len(page) == N_PER_PAGE
+        assert "?cursor=" in response.content.decode()
+
+        response = client.get("/", {"cursor": page.next_cursor})
+        assert response.status_code == 200
+        assert not set(response.context["page_obj"]) & set(page)
+
+        response = client.get("/", {"cursor": "not-a-cursor"})
+        assert response.status_code == 404
@@ -0,0 +1,139 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+from blog import feeds
+from blog.feeds import feed_ids
+from blog.models import Post
+from blog.publication import sync_visibility
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def materialized_feeds(settings):
+    settings.BLOG_MATERIALIZED_FEEDS = True
+    settings.BLOG_PAGE_CACHE_TIMEOUT = 0
+    cache.clear()
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category, published_location,
+              django_capture_on_commit_callbacks):
+    def make(hours_ago=1, **kwargs):
+        fields = {
+            "author": user,
+            "category": published_category,
+            "location": published_location,
+            "is_published": True,
+            "pub_date": timezone.now() - timedelta(hours=hours_ago),
+            **kwargs,
+        }
+        with django_capture_on_commit_callbacks(execute=True):
+            return mixer.blend("blog.Post", **fields)
+
+    return make
+
+
+def expected_ids(**filters):
+    return list(
+        Post.objects.filter(**filters)
+        .order_by("-pub_date", "-id")
+        .values_list("id", flat=True)
+    )
+
+
+def test_category_page_uses_materialized_feed(
+        client, make_post, published_category, django_assert_num_queries):
+    for hours_ago in range(15):
+        make_post(hours_ago)
+    url = f"/category/{published_category.slug}/"
+    client.get(url)
+    # Категория и одна выборка публикаций по идентификаторам, без COUNT(*).
+    with django_assert_num_queries(2):
+        response = client.get(url + "?page=2")
+    ids = expected_ids(category=published_category, is_visible=True)
+    assert [post.id for post in response.context["page_obj"]] == ids[10:], (
+        "Убедитесь, что страница материализованной ленты совпадает с"
+        " лентой из базы данных."
+    )
+    assert response.context["paginator"].count == len(ids)
+
+
+def test_feed_is_updated_incrementally(
+        make_post, published_category, mixer,
+        django_assert_num_queries, django_capture_on_commit_callbacks):
+    old = make_post(hours_ago=5)
+    assert feed_ids("category", published_category.id) == [old.id]
+
+    new = make_post(hours_ago=1)
+    middle = make_post(hours_ago=3)
+    with django_assert_num_queries(0):
+        ids = feed_ids("category", published_category.id)
+    assert ids == [new.id, middle.id, old.id], (
+        "Убедитесь, что новая публикация встаёт в ленту на своё место"
+        " без перестроения ленты."
+    )
+
+    other = mixer.blend("blog.Category", is_published=True)
+    with django_capture_on_commit_callbacks(execute=True):
+        middle.category = other
+        middle.save()
+    assert feed_ids("category", published_category.id) == [new.id, old.id]
+    assert feed_ids("category", other.id) == [middle.id]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        new.delete()
+    with django_assert_num_queries(0):
+        assert feed_ids("category", published_category.id) == [old.id]
+
+
+def test_bulk_visibility_change_rebuilds_feeds(make_post, published_category):
+    post = make_post(hours_ago=1)
+    scheduled = make_post(hours_ago=-1)
+    assert feed_ids("category", published_category.id) == [post.id]
+    Post.objects.filter(pk=scheduled.pk).update(
+        pub_date=timezone.now() - timedelta(hours=2)
+    )
+    sync_visibility()
+    assert feed_ids("category", published_category.id) == [
+        post.id, scheduled.id
+    ], "Убедитесь, что публикация по расписанию появляется в ленте."
+
+
+def test_profile_feed_matches_queryset(client, user, make_post):
+    for hours_ago in range(12):
+        make_post(hours_ago)
+    response = client.get(f"/profile/{user.username}/")
+    assert [post.id for post in response.context["page_obj"]] == (
+        expected_ids(author=user)[:10]
+    )
+
+
+def test_feed_is_rebuilt_without_atomic_incr(
+        make_post, published_category, monkeypatch):
+    monkeypatch.setattr(feeds, "_incr_is_atomic", lambda: False)
+    old = make_post(hours_ago=5)
+    assert feed_ids("category", published_category.id) == [old.id]
+    new = make_post(hours_ago=1)
+    assert cache.get(f"blog:feed:category:{published_category.id}") is None, (
+        "Убедитесь, что без атомарного cache.incr лента не правится на"
+        " месте, а удаляется."
+    )
+    assert feed_ids("category", published_category.id) == [new.id, old.id]
+
+
+def test_evicted_epoch_does_not_revive_stale_feed(
+        make_post, published_category):
+    post = make_post(hours_ago=1)
+    hidden = make_post(hours_ago=2)
+    assert feed_ids("category", published_category.id) == [post.id, hidden.id]
+    Post.objects.filter(pk=hidden.pk).update(is_published=False)
+    sync_visibility()
+    cache.delete(feeds.FEEDS_EPOCH_KEY)
+    assert feed_ids("category", published_category.id) == [post.id], (
+        "Убедитесь, что после вытеснения счётчика эпох из кэша старый список"
+        " ленты не считается актуальным."
+    )
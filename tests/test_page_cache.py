@@ -0,0 +1,51 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def page_cache(settings):
+    settings.BLOG_PAGE_CACHE_TIMEOUT = 60
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_anonymous_pages_are_cached(client, post_with_published_location):
+    post = post_with_published_location
+    for url in ("/", f"/posts/{post.id}/",
+                f"/category/{post.category.slug}/"):
+        client.get(url)
+        with CaptureQueriesContext(connection) as captured:
+            response = client.get(url)
+        assert response.status_code == 200
+        assert len(captured) == 0, (
+            f"Убедитесь, что страница `{url}` для анонимного посетителя"
+            " отдаётся из кэша."
+        )
+        assert "Cookie" in response["Vary"]
+
+
+def test_page_cache_is_purged_on_changes(
+        client, mixer, post_with_published_location):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/"
+    client.get(url)
+    mixer.blend("blog.Comment", post=post, text="Свежий комментарий")
+    assert "Свежий комментарий" in client.get(url).content.decode()
+
+    post.title = "Новый заголовок"
+    post.save()
+    assert "Новый заголовок" in client.get("/").content.decode()
+
+
+def test_page_cache_bypassed_with_session(
+        user_client, post_with_published_location):
+    user_client.get("/")
+    with CaptureQueriesContext(connection) as captured:
+        response = user_client.get("/")
+    assert response.status_code == 200
+    assert len(captured) > 0
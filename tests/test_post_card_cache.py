@@ -0,0 +1,34 @@
+import pytest
+from django.core.cache import cache
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_post_card_cache_invalidation(
+        client, mixer, post_with_published_location):
+    post = post_with_published_location
+    content = client.get("/").content.decode()
+    assert "Комментарии (0)" in content
+
+    category = post.category
+    category.title = "Совершенно новое название"
+    category.save()
+    content = client.get("/").content.decode()
+    assert category.title in content, (
+        "Убедитесь, что кэш карточки публикации сбрасывается при изменении"
+        " категории."
+    )
+
+    mixer.blend("blog.Comment", post=post)
+    content = client.get("/").content.decode()
+    assert "Комментарии (1)" in content, (
+        "Убедитесь, что кэш карточки публикации сбрасывается при добавлении"
+        " комментария."
+    )
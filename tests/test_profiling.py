@@ -0,0 +1,98 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.template.base import Template
+from django.test import Client, RequestFactory
+
+from blog import async_views, profiling
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def profiled_client(settings):
+    settings.BLOG_PROFILING = True
+    settings.BLOG_PAGE_CACHE_TIMEOUT = 0
+    cache.clear()
+    profiling.reset()
+    yield Client()
+    profiling.reset()
+
+
+def test_requests_are_profiled_per_view(
+        profiled_client, post_with_published_location):
+    post = post_with_published_location
+    profiled_client.get("/")
+    profiled_client.get("/")
+    profiled_client.get(f"/posts/{post.id}/")
+    views = profiling.snapshot()["views"]
+    assert views["blog:index"]["wall_ms"]["count"] == 2, (
+        "Убедитесь, что запросы учитываются по имени маршрута."
+    )
+    index = views["blog:index"]
+    assert index["sql_count"]["max"] >= 1, (
+        "Убедитесь, что профилировщик считает SQL-запросы страницы."
+    )
+    assert index["template_ms"]["mean"] > 0, (
+        "Убедитесь, что профилировщик замеряет отрисовку шаблонов."
+    )
+    assert sum(index["wall_ms"]["buckets"].values()) == 2
+    assert views["blog:post_detail"]["sql_count"]["count"] == 1
+
+
+def test_profiling_endpoint_is_staff_only(
+        profiled_client, user_client, mixer):
+    profiled_client.get("/")
+    assert user_client.get("/profiling/").status_code == 302, (
+        "Убедитесь, что статистика профилирования доступна только"
+        " персоналу."
+    )
+    profiled_client.force_login(
+        mixer.blend(get_user_model(), is_staff=True)
+    )
+    data = profiled_client.get("/profiling/").json()
+    assert data["enabled"] is True
+    assert "blog:index" in data["views"]
+
+
+def test_profile_is_dumped_periodically(profiled_client, settings, tmp_path):
+    settings.BLOG_PROFILING_DUMP_PATH = str(tmp_path / "profile-{pid}.json")
+    settings.BLOG_PROFILING_DUMP_INTERVAL = 0
+    profiled_client.get("/")
+    [dump] = tmp_path.glob("profile-*.json")
+    data = json.loads(dump.read_text(encoding="utf-8"))
+    assert data["views"]["blog:index"]["wall_ms"]["count"] == 1, (
+        "Убедитесь, что статистика периодически сохраняется в JSON-файл."
+    )
+
+
+def test_disabled_profiling_records_nothing(client, settings):
+    settings.BLOG_PROFILING = False
+    profiling.reset()
+    client.get("/")
+    assert profiling.snapshot()["views"] == {}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_view_is_profiled_across_threads(
+        profiled_client, post_with_published_location):
+    original_render = Template.render
+    request = RequestFactory().get("/")
+    request.user = AnonymousUser()
+    request.session = {}
+    view = async_views.PostListView.as_view()
+    profiling.profile_request(
+        lambda request: async_to_sync(view)(request), request
+    )
+    stats = profiling.snapshot()["views"][profiling.UNRESOLVED]
+    assert stats["sql_count"]["max"] >= 2, (
+        "Убедитесь, что учитываются запросы из потоков run_orm."
+    )
+    assert stats["template_ms"]["mean"] > 0
+    assert Template.render is original_render, (
+        "Убедитесь, что после запроса Template.render восстанавливается."
+    )
@@ -0,0 +1,64 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_scheduled_post_is_published_by_command(
+        client, mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(days=1),
+    )
+    assert not post.is_visible
+
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1))
+    call_command("publish_scheduled", stdout=StringIO())
+
+    post.refresh_from_db()
+    assert post.is_visible, (
+        "Убедитесь, что команда `publish_scheduled` показывает в лентах"
+        " публикации, дата которых наступила."
+    )
+    assert post in client.get("/").context["page_obj"]
+
+
+def test_category_unpublishing_hides_posts(post_with_published_location):
+    post = post_with_published_location
+    assert post.is_visible
+    category = post.category
+    category.is_published = False
+    category.save()
+    post.refresh_from_db()
+    assert not post.is_visible, (
+        "Убедитесь, что при снятии категории с публикации её публикации"
+        " пропадают из лент."
+    )
+
+
+def test_visibility_reuses_loaded_category(
+        mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(hours=1),
+    )
+    with CaptureQueriesContext(connection) as captured:
+        post.title = "Новый заголовок"
+        post.save()
+    assert post.is_visible
+    assert not [
+        query for query in captured.captured_queries
+        if "blog_category" in query["sql"]
+    ], (
+        "Убедитесь, что при сохранении публикации видимость считается по"
+        " уже загруженной категории, без запроса к базе."
+    )
@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize("n_posts", [1, N_PER_PAGE * 2])
+def test_category_page_query_count(
+        n_posts, mixer, client, user, published_category,
+        django_assert_num_queries):
+    mixer.cycle(n_posts).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+    )
+    # Категория, COUNT(*) для пагинатора и страница публикаций.
+    with django_assert_num_queries(3):
+        response = client.get(f"/category/{published_category.slug}/")
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("action", ["edit", "delete"])
+def test_post_owner_views_fetch_post_once(
+        action, user_client, post_with_published_location):
+    post = post_with_published_location
+    with CaptureQueriesContext(connection) as captured:
+        response = user_client.get(f"/posts/{post.id}/{action}/")
+    assert response.status_code == 200
+    post_queries = [
+        query["sql"] for query in captured.captured_queries
+        if 'FROM "blog_post"' in query["sql"]
+    ]
+    assert len(post_queries) == 1, (
+        "Убедитесь, что при проверке авторства публикация загружается из базы"
+        " данных один раз:\n" + "\n".join(post_queries)
+    )
+
+
+@pytest.mark.parametrize("n_comments", [1, 20])
+def test_post_detail_query_count(
+        n_comments, mixer, client, post_with_published_location,
+        django_assert_num_queries):
+    post = post_with_published_location
+    mixer.cycle(n_comments).blend("blog.Comment", post=post)
+    # Публикация вместе со связанными объектами и комментарии с авторами.
+    with django_assert_num_queries(2):
+        response = client.get(f"/posts/{post.id}/")
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("n_posts", [1, N_PER_PAGE * 2])
+def test_profile_page_query_count(
+        n_posts, mixer, client, user, published_category,
+        published_location, django_assert_num_queries):
+    mixer.cycle(n_posts).blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location, is_published=True,
+    )
+    # Пользователь, COUNT(*) для пагинатора и страница публикаций вместе
+    # с категориями и местоположениями.
+    with django_assert_num_queries(3):
+        response = client.get(f"/profile/{user.username}/")
+    assert response.status_code == 200
+
+
+def test_profile_hides_unpublished_posts_from_visitors(
+        mixer, client, user_client, user, published_category):
+    visible, hidden = mixer.cycle(2).blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() - timedelta(days=1),
+        is_published=(flag for flag in (True, False)),
+    )
+    url = f"/profile/{user.username}/"
+    visitor_ids = [post.id for post in client.get(url).context["page_obj"]]
+    assert visitor_ids == [visible.id], (
+        "Убедитесь, что посетители не видят в профиле снятые с публикации"
+        " и отложенные публикации автора."
+    )
+    owner_ids = {post.id for post in user_client.get(url).context["page_obj"]}
+    assert owner_ids == {visible.id, hidden.id}, (
+        "Убедитесь, что автор видит в профиле все свои публикации."
+    )
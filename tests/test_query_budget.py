@@ -0,0 +1,233 @@
+"""Бюджет SQL-запросов для каждого маршрута приложений blog и pages.
+
+Размер синтетического набора данных задаётся переменными окружения
+QUERY_BUDGET_POSTS и QUERY_BUDGET_COMMENTS. Если задана переменная
+QUERY_BUDGET_REPORT, по итогам прогона в указанный файл записывается
+JSON-отчёт, который удобно сравнивать между релизами.
+"""
+import json
+import os
+import random
+import time
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from mixer.backend.django import mixer
+
+from blog import urls as blog_urls
+from blog.models import Category, Comment, Location, Post
+from pages import urls as pages_urls
+
+N_POSTS = int(os.getenv("QUERY_BUDGET_POSTS", 2000))
+N_COMMENTS = int(os.getenv("QUERY_BUDGET_COMMENTS", 4000))
+N_USERS = 20
+N_CATEGORIES = 5
+REPORT_PATH = os.getenv("QUERY_BUDGET_REPORT")
+
+# Бюджеты складываются из формы запросов страницы и не зависят от объёма
+# данных: на каждую выборку — один запрос, без N+1.
+# Авторизованному клиенту нужны сессия и пользователь.
+AUTH = 2
+# Лента: COUNT(*) и страница публикаций с автором, категорией и местом.
+FEED = 2
+# Страница публикации: публикация и первая порция комментариев.
+DETAIL = 2
+# Форма публикации: списки категорий и местоположений.
+POST_FORM = 2
+
+# (имя маршрута, метод, клиент, максимальное число запросов).
+# Клиент "author" — автор публикации и комментария из набора данных,
+# "anonymous" — неавторизованный посетитель.
+BUDGETS = [
+    ("blog:index", "get", "anonymous", FEED),
+    ("blog:index", "get", "author", AUTH + FEED),
+    ("blog:post_detail", "get", "anonymous", DETAIL),
+    ("blog:post_detail", "get", "author", AUTH + DETAIL),
+    ("blog:post_comments", "get", "anonymous", DETAIL),
+    ("blog:post_comments", "get", "author", AUTH + DETAIL),
+    ("blog:create_post", "get", "author", AUTH + POST_FORM),
+    # Публикация и форма; у формы удаления — только список местоположений.
+    ("blog:edit_post", "get", "author", AUTH + 1 + POST_FORM),
+    ("blog:delete_post", "get", "author", AUTH + 1 + 1),
+    # Публикация, затем SAVEPOINT, INSERT, UPDATE счётчика и RELEASE.
+    ("blog:add_comment", "post", "author", AUTH + 1 + 4),
+    # Комментарий и его автор.
+    ("blog:edit_comment", "get", "author", AUTH + 2),
+    ("blog:delete_comment", "get", "author", AUTH + 2),
+    # Категория и лента.
+    ("blog:category_posts", "get", "anonymous", 1 + FEED),
+    ("blog:search", "get", "anonymous", FEED),
+    ("blog:search", "get", "author", AUTH + FEED),
+    # Профиль и лента автора.
+    ("blog:profile", "get", "anonymous", 1 + FEED),
+    ("blog:profile", "get", "author", AUTH + 1 + FEED),
+    # Группы и права пользователя и полные списки групп и прав.
+    ("blog:edit_profile", "get", "author", AUTH + 4),
+    # Статистика профилирования не обращается к базе.
+    ("blog:profiling", "get", "anonymous", 0),
+    ("blog:profiling", "get", "author", AUTH),
+    # Лента API листается курсором, без COUNT(*).
+    ("blog:api_index", "get", "anonymous", 1),
+    ("blog:api_index", "get", "author", AUTH + 1),
+    ("blog:api_post_detail", "get", "anonymous", DETAIL),
+    ("blog:api_post_detail", "get", "author", AUTH + DETAIL),
+    ("blog:api_category_posts", "get", "anonymous", 1 + 1),
+    ("blog:api_profile", "get", "anonymous", 1 + 1),
+    ("blog:api_profile", "get", "author", AUTH + 1 + 1),
+    ("pages:about", "get", "anonymous", 0),
+    ("pages:rules", "get", "anonymous", 0),
+]
+
+report = {}
+
+
+@pytest.fixture(scope="module")
+def dataset(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        users = mixer.cycle(N_USERS).blend(get_user_model())
+        categories = mixer.cycle(N_CATEGORIES).blend(
+            "blog.Category", is_published=True
+        )
+        locations = mixer.cycle(N_CATEGORIES).blend(
+            "blog.Location", is_published=True
+        )
+        now = timezone.now()
+        Post.objects.bulk_create(
+            Post(
+                title=f"Post {i}",
+                text="Lorem ipsum dolor sit amet " * 10,
+                pub_date=now - timedelta(minutes=i),
+                author=random.choice(users),
+                category=random.choice(categories),
+                location=random.choice(locations),
+            )
+            for i in range(N_POSTS)
+        )
+        post_ids = list(
+            Post.objects.filter(author__in=users).values_list("id", flat=True)
+        )
+        Comment.objects.bulk_create(
+            Comment(
+                text=f"Comment {i}",
+                post_id=random.choice(post_ids),
+                author=random.choice(users),
+            )
+            for i in range(N_COMMENTS)
+        )
+        post = (
+            Post.objects.filter(author__in=users)
+            .select_related("author", "category").first()
+        )
+        comment = Comment.objects.create(
+            text="Comment of the post author", post=post, author=post.author
+        )
+        call_command("recount_comments", stdout=StringIO())
+        call_command("publish_scheduled", stdout=StringIO())
+        call_command("rebuild_search_index", stdout=StringIO())
+        yield {
+            "author": comment.author,
+            "post": comment.post,
+            "comment": comment,
+            "category": comment.post.category,
+        }
+        # Удаляются только созданные здесь записи; публикации и комментарии
+        # уходят каскадом вместе с пользователями.
+        get_user_model().objects.filter(
+            pk__in=[user.pk for user in users]).delete()
+        Category.objects.filter(
+            pk__in=[category.pk for category in categories]).delete()
+        Location.objects.filter(
+            pk__in=[location.pk for location in locations]).delete()
+
+    if REPORT_PATH:
+        with open(REPORT_PATH, "w", encoding="utf-8") as report_file:
+            json.dump(
+                {
+                    "posts": N_POSTS,
+                    "comments": N_COMMENTS,
+                    "views": report,
+                },
+                report_file,
+                ensure_ascii=False,
+                indent=2,
+                sort_keys=True,
+            )
+
+
+def route_args(name, data):
+    post = data["post"]
+    return {
+        "blog:post_detail": (post.id,),
+        "blog:post_comments": (post.id,),
+        "blog:api_post_detail": (post.id,),
+        "blog:api_category_posts": (data["category"].slug,),
+        "blog:api_profile": (data["author"].username,),
+        "blog:edit_post": (post.id,),
+        "blog:delete_post": (post.id,),
+        "blog:add_comment": (post.id,),
+        "blog:edit_comment": (post.id, data["comment"].id),
+        "blog:delete_comment": (post.id, data["comment"].id),
+        "blog:category_posts": (data["category"].slug,),
+        "blog:profile": (data["author"].username,),
+        "blog:edit_profile": (data["author"].username,),
+    }.get(name, ())
+
+
+def route_query(name):
+    return {"blog:search": "?q=lorem"}.get(name, "")
+
+
+def test_every_route_has_budget():
+    budgeted = {name for name, *_ in BUDGETS}
+    for module in (blog_urls, pages_urls):
+        for pattern in module.urlpatterns:
+            name = f"{module.app_name}:{pattern.name}"
+            assert name in budgeted, (
+                f"Задайте бюджет SQL-запросов для маршрута `{name}`."
+            )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    ("name", "method", "client_kind", "max_queries"),
+    BUDGETS,
+    ids=[f"{name}-{kind}" for name, _, kind, _ in BUDGETS],
+)
+def test_query_budget(dataset, name, method, client_kind, max_queries):
+    client = Client()
+    if client_kind == "author":
+        client.force_login(dataset["author"])
+    url = reverse(name, args=route_args(name, dataset)) + route_query(name)
+    payload = {"text": "Budget comment"} if method == "post" else None
+    cache.clear()
+
+    with CaptureQueriesContext(connection) as captured:
+        started = time.perf_counter()
+        response = getattr(client, method)(url, payload)
+        wall_time = time.perf_counter() - started
+
+    assert response.status_code < 400, (
+        f"Страница `{url}` вернула код {response.status_code}."
+    )
+    sql_time = sum(float(query["time"]) for query in captured.captured_queries)
+    report[f"{name}[{client_kind}]"] = {
+        "url": url,
+        "queries": len(captured),
+        "max_queries": max_queries,
+        "sql_time": round(sql_time, 6),
+        "wall_time": round(wall_time, 6),
+    }
+    assert len(captured) <= max_queries, (
+        f"Страница `{url}` выполнила {len(captured)} SQL-запросов при"
+        f" бюджете {max_queries}:\n"
+        + "\n".join(query["sql"] for query in captured.captured_queries)
+    )
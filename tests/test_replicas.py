@@ -0,0 +1,118 @@
+from types import SimpleNamespace
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from blog import routers
+from blog.models import Post
+from blog.routers import (PIN_COOKIE, ReplicaRouter, pin_to_primary,
+                          replica_reads)
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def chosen(settings, monkeypatch):
+    # Реплика — та же тестовая база, запоминаем только факт выбора реплики.
+    settings.BLOG_REPLICA_DATABASES = ["default"]
+    settings.BLOG_PAGE_CACHE_TIMEOUT = 0
+    cache.clear()
+    calls = []
+    monkeypatch.setattr(routers, "random", SimpleNamespace(
+        choice=lambda aliases: calls.append(aliases) or aliases[0]
+    ))
+    return calls
+
+
+def test_router_sends_only_blog_reads_to_replicas(settings):
+    settings.BLOG_REPLICA_DATABASES = ["replica1"]
+    router = ReplicaRouter()
+    request = RequestFactory().get("/")
+    assert router.db_for_read(Post) is None, (
+        "Убедитесь, что вне views для чтения запросы идут в основную базу."
+    )
+    with replica_reads(request):
+        assert router.db_for_read(Post) == "replica1", (
+            "Убедитесь, что views для чтения читают публикации с реплики."
+        )
+        assert router.db_for_read(get_user_model()) is None
+    request.COOKIES[PIN_COOKIE] = "9999999999"
+    with replica_reads(request):
+        assert router.db_for_read(Post) == "replica1", (
+            "Убедитесь, что неподписанная метка не закрепляет чтения за"
+            " основной базой."
+        )
+    request.COOKIES[PIN_COOKIE] = pin_to_primary(
+        HttpResponse()).cookies[PIN_COOKIE].value
+    with replica_reads(request):
+        assert router.db_for_read(Post) is None, (
+            "Убедитесь, что после записи пользователь читает из основной"
+            " базы."
+        )
+    assert router.allow_migrate("replica1", "blog") is False
+    post = Post()
+    post._state.db = "replica1"
+    assert router.db_for_write(Post, instance=post) == "default"
+
+
+def test_read_views_use_replica(client, chosen, post_with_published_location):
+    post = post_with_published_location
+    for url in ("/", f"/posts/{post.id}/", f"/profile/{post.author}/",
+                "/api/posts/"):
+        chosen.clear()
+        assert client.get(url).status_code == 200
+        assert chosen, f"Убедитесь, что страница {url} читается с реплики."
+
+
+def test_author_reads_primary_after_write(
+        user_client, chosen, post_with_published_location):
+    post = post_with_published_location
+    response = user_client.post(
+        f"/posts/{post.id}/comment/", data={"text": "Новый комментарий"}
+    )
+    assert PIN_COOKIE in response.cookies, (
+        "Убедитесь, что после записи пользователь закрепляется за основной"
+        " базой."
+    )
+    chosen.clear()
+    response = user_client.get(f"/posts/{post.id}/")
+    assert not chosen, (
+        "Убедитесь, что сразу после записи страница читается из основной"
+        " базы, а не с реплики."
+    )
+    assert "Новый комментарий" in response.content.decode()
+
+
+def test_no_pin_without_replicas(user_client, post_with_published_location):
+    response = user_client.post(
+        f"/posts/{post_with_published_location.id}/comment/",
+        data={"text": "Комментарий"},
+    )
+    assert PIN_COOKIE not in response.cookies
+
+
+def test_replica_pages_get_no_validators(
+        client, user_client, chosen, settings, post_with_published_location):
+    settings.BLOG_PAGE_CACHE_TIMEOUT = 60
+    post = post_with_published_location
+    for url in ("/", f"/posts/{post.id}/", "/api/posts/"):
+        response = client.get(url)
+        assert not response.has_header("ETag"), (
+            "Убедитесь, что страница, прочитанная с реплики, не получает"
+            " ETag текущего поколения кэша."
+        )
+        chosen.clear()
+        client.get(url)
+        assert chosen, (
+            f"Убедитесь, что страница {url} с реплики не попадает в кэш"
+            " страниц."
+        )
+    user_client.post(
+        f"/posts/{post.id}/comment/", data={"text": "Комментарий"}
+    )
+    assert user_client.get("/").has_header("ETag"), (
+        "Убедитесь, что страница из основной базы по-прежнему получает ETag."
+    )
@@ -0,0 +1,124 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+from blog import search
+from blog.models import Post
+from blog.search import search_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+def found_ids(client, query):
+    response = client.get("/search/", {"q": query})
+    assert response.status_code == 200
+    return [post.id for post in response.context["page_obj"]]
+
+
+@pytest.fixture
+def posts(mixer, published_category, published_location):
+    def make(title, text):
+        return mixer.blend(
+            "blog.Post",
+            title=title,
+            text=text,
+            pub_date=timezone.now() - timedelta(days=1),
+            is_published=True,
+            category=published_category,
+            location=published_location,
+        )
+
+    return make
+
+
+def test_search_follows_post_changes(client, posts):
+    post = posts("Осенний лес", "Прогулка по парку")
+    assert found_ids(client, "лес") == [post.id]
+    assert found_ids(client, "ПАРК") == [post.id], (
+        "Убедитесь, что поиск не зависит от регистра и находит слова"
+        " по началу."
+    )
+    post.title = "Зимнее поле"
+    post.save()
+    assert found_ids(client, "лес") == []
+    assert found_ids(client, "поле") == [post.id], (
+        "Убедитесь, что после изменения публикации обновляется"
+        " поисковый индекс."
+    )
+    post.delete()
+    assert found_ids(client, "поле") == []
+
+
+def test_search_ranks_title_matches_first(client, posts):
+    in_text = posts("Заметка", "Немного про горы и реки")
+    in_title = posts("Горы", "Заметка о походе")
+    assert found_ids(client, "горы") == [in_title.id, in_text.id], (
+        "Убедитесь, что совпадения в заголовке выше совпадений в тексте."
+    )
+
+
+def test_search_hides_invisible_posts(client, posts):
+    post = posts("Черновик", "Текст")
+    Post.objects.filter(pk=post.pk).update(is_visible=False)
+    assert found_ids(client, "черновик") == []
+
+
+def test_search_ignores_query_syntax(client, posts):
+    posts("Обычная публикация", "Текст")
+    for query in ('"', "AND OR", "NEAR(", "*", "   "):
+        assert found_ids(client, query) == []
+
+
+def test_search_pagination_keeps_query(client, posts):
+    for i in range(11):
+        posts(f"Публикация {i}", "Текст про море")
+    response = client.get("/search/", {"q": "море"})
+    assert response.context["page_obj"].has_next()
+    assert "?q=%D0%BC%D0%BE%D1%80%D0%B5&amp;page=2" in response.content.decode()
+
+
+def test_admin_search_uses_index(admin_client, posts):
+    post = posts("Горное озеро", "Текст")
+    posts("Другая публикация", "Текст")
+    response = admin_client.get("/admin/blog/post/", {"q": "озеро"})
+    assert [obj.id for obj in response.context["cl"].result_list] == [post.id]
+
+
+@pytest.mark.skipif(connection.vendor != "sqlite", reason="FTS5 только в SQLite")
+def test_search_uses_fts_table(posts):
+    posts("Текст", "Текст")
+    sql = str(search_posts("текст").query)
+    assert "blog_post_fts" in sql and "LIKE" not in sql.upper()
+
+
+def test_raw_update_is_not_indexed_until_rebuild(posts):
+    post = posts("Старое", "Текст")
+    Post.objects.filter(pk=post.pk).update(title="Новое")
+    assert not search_posts("новое").exists()
+    call_command("rebuild_search_index", stdout=StringIO())
+    assert list(search_posts("новое")) == [post], (
+        "Убедитесь, что команда rebuild_search_index заново заполняет"
+        " поисковый индекс."
+    )
+
+
+@pytest.mark.parametrize("backend", ["fts5", "postgres", "like"])
+def test_search_without_matches_is_empty(client, monkeypatch, posts, backend):
+    if backend == "postgres":
+        pytest.importorskip("psycopg2")
+    posts("Горное озеро", "Прогулка к озеру.")
+    monkeypatch.setattr(search, "search_backend", lambda: backend)
+    if backend == "postgres" and connection.vendor != "postgresql":
+        # Запрос PostgreSQL здесь не выполнить: проверяем, что он с фильтром.
+        assert search_posts("вулкан").query.where, (
+            "Убедитесь, что поиск в PostgreSQL отбирает подходящие"
+            " публикации, а не только сортирует все."
+        )
+        return
+    assert found_ids(client, "вулкан") == [], (
+        "Убедитесь, что на запрос без совпадений выдача пуста."
+    )
@@ -0,0 +1,31 @@
+import pytest
+from django.db import connection
+
+from blog.sqlite import tune_sqlite_connection
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(connection.vendor != "sqlite", reason="только SQLite"),
+]
+
+
+def pragma(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+def test_sqlite_pragmas_applied_on_connect(settings):
+    previous = {name: pragma(name) for name in ("busy_timeout", "cache_size")}
+    settings.BLOG_SQLITE_PRAGMAS = {"busy_timeout": 1234, "cache_size": -2048}
+    try:
+        tune_sqlite_connection(sender=None, connection=connection)
+        assert pragma("busy_timeout") == 1234, (
+            "Убедитесь, что при создании соединения выполняются PRAGMA из"
+            " настройки BLOG_SQLITE_PRAGMAS."
+        )
+        assert pragma("cache_size") == -2048
+    finally:
+        settings.BLOG_SQLITE_PRAGMAS = previous
+        tune_sqlite_connection(sender=None, connection=connection)
+